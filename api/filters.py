@@ -26,11 +26,12 @@ class ScheduleFilter(django_filters.FilterSet):
     task_definition = django_filters.NumberFilter()
     is_active = django_filters.BooleanFilter()
     created_at = django_filters.DateTimeFromToRangeFilter()
+    next_run_at = django_filters.DateTimeFromToRangeFilter()
     
     class Meta:
         from schedules.models import Schedule
         model = Schedule
-        fields = ['user', 'task_definition', 'is_active', 'created_at']
+        fields = ['user', 'task_definition', 'is_active', 'created_at', 'next_run_at']
 
 
 class ExecutionLogFilter(django_filters.FilterSet):
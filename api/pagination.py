@@ -1,11 +1,24 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import datetime
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
-class DynamicPageSizePagination(PageNumberPagination):
+
+class DynamicPageSizeMixin:
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
-    
+
     def get_page_size(self, request):
         # Determine admin using custom flag with fallback to Django's built-in
         is_admin = False
@@ -29,4 +42,135 @@ class DynamicPageSizePagination(PageNumberPagination):
                 return min(int(requested_size), 10)
             except (ValueError, TypeError):
                 pass
-        return 10
\ No newline at end of file
+        return 10
+
+
+class DynamicPageSizePagination(DynamicPageSizeMixin, PageNumberPagination):
+    pass
+
+
+class KeysetPagination(DynamicPageSizeMixin, BasePagination):
+    """Cursor pagination that seeks on a unique ordering instead of COUNT + OFFSET.
+
+    Opt-in per request with ``?pagination=keyset``; the ordering must end in a
+    unique field (``id``) so every row has a distinct position. The order is
+    fixed, so ``?ordering=`` is rejected rather than silently ignored.
+    """
+
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode = 'keyset'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering_query_param = api_settings.ORDERING_PARAM
+
+    @classmethod
+    def is_requested(cls, request):
+        return request.query_params.get(cls.mode_query_param) == cls.mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if request.query_params.get(self.ordering_query_param):
+            raise ValidationError({
+                self.ordering_query_param: [f'Ordering is fixed to {",".join(self.ordering)} in keyset pagination']
+            })
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.get_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(queryset.model, ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return list(self.ordering)
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def seek_filter(self, model, ordering, position):
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = [Q(**{ordering[i].lstrip('-'): position[i]}) for i in range(index)]
+            conditions.append(reduce(and_, equal + [Q(**{f'{name}__{lookup}': position[index]})]))
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values, reverse = payload['p'], bool(payload['r'])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            # Typed here so a forged value fails as a bad cursor, not while the filter is built
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            if any(value is None for value in values):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            values.append(value)
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ScheduleKeysetPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ExecutionLogKeysetPagination(KeysetPagination):
+    ordering = ('-started_at', '-id')
@@ -0,0 +1,29 @@
+from django.db.models import Aggregate, FloatField
+
+
+class Percentile(Aggregate):
+    """PERCENTILE_CONT ordered-set aggregate (PostgreSQL only)."""
+
+    function = 'PERCENTILE_CONT'
+    name = 'Percentile'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        if not 0 <= percentile <= 1:
+            raise ValueError('percentile must be between 0 and 1')
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+    def _resolve_output_field(self):
+        source_field = self.get_source_fields()[0]
+        return source_field if source_field is not None else FloatField()
+
+
+def percentile(sorted_values, fraction):
+    """Linear interpolation matching PERCENTILE_CONT, for backends without it."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * weight
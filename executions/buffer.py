@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+BUFFERED_FIELDS = [
+    'status', 'run', 'attempt', 'started_at', 'completed_at', 'result', 'error_message', 'execution_time'
+]
+
+
+class ExecutionLogBuffer:
+    """Write-behind buffer for completed ExecutionLog rows.
+
+    Records are keyed by celery_task_id so a retry replaces its earlier
+    attempt, and are flushed with bulk writes once ``max_size`` records are
+    pending or ``flush_interval`` seconds have passed since the first one.
+
+    A failed write never reaches the caller: the batch is logged and put
+    back for the next flush, and records still unwritten after
+    ``max_flush_attempts`` are dropped.
+    """
+
+    max_flush_attempts = 3
+
+    def __init__(self, max_size=None, flush_interval=None):
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._first_added_at = None
+        self._failed_attempts = {}
+
+    @property
+    def max_size(self):
+        return self._max_size or getattr(settings, 'EXECUTION_LOG_BATCH_SIZE', 100)
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or getattr(settings, 'EXECUTION_LOG_FLUSH_INTERVAL', 5.0)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, execution_log):
+        execution_log.compute_execution_time()
+        with self._lock:
+            self._pending[execution_log.celery_task_id] = execution_log
+            if self._first_added_at is None:
+                self._first_added_at = time.monotonic()
+                self._start_timer()
+            due = (
+                len(self._pending) >= self.max_size
+                or time.monotonic() - self._first_added_at >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records = list(self._pending.values())
+            self._pending = {}
+            self._first_added_at = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not records:
+            return 0
+        try:
+            self._write(records)
+        except Exception:
+            logger.exception('Failed to write %d buffered execution logs', len(records))
+            self._requeue(records)
+            return 0
+        with self._lock:
+            for record in records:
+                self._failed_attempts.pop(record.celery_task_id, None)
+        return len(records)
+
+    def _requeue(self, records):
+        dropped = []
+        with self._lock:
+            for record in records:
+                key = record.celery_task_id
+                attempts = self._failed_attempts.get(key, 0) + 1
+                if attempts >= self.max_flush_attempts:
+                    self._failed_attempts.pop(key, None)
+                    dropped.append(key)
+                    continue
+                self._failed_attempts[key] = attempts
+                # A newer attempt of the same task added meanwhile wins
+                self._pending.setdefault(key, record)
+            if self._pending and self._first_added_at is None:
+                self._first_added_at = time.monotonic()
+                self._start_timer()
+        if dropped:
+            logger.error('Dropped %d execution logs after %d failed writes: %s',
+                         len(dropped), self.max_flush_attempts, ', '.join(dropped))
+
+    def _write(self, records):
+        from .models import ExecutionLog
+
+        # A retry may have been flushed by another worker; partitioned tables
+        # can't upsert on celery_task_id alone, so resolve those rows first
+        unresolved = {record.celery_task_id: record for record in records if record.pk is None}
+        if unresolved:
+            for pk, celery_task_id in ExecutionLog.objects.filter(
+                celery_task_id__in=list(unresolved)
+            ).values_list('pk', 'celery_task_id'):
+                unresolved[celery_task_id].pk = pk
+
+        existing = [record for record in records if record.pk is not None]
+        new = [record for record in records if record.pk is None]
+        try:
+            with transaction.atomic():
+                if new:
+                    ExecutionLog.objects.bulk_create(new)
+                if existing:
+                    ExecutionLog.objects.bulk_update(existing, BUFFERED_FIELDS)
+        except Exception:
+            # Rolled back: pks set by bulk_create don't exist, and a row another
+            # process inserted meanwhile is found by the next attempt's lookup
+            for record in new:
+                record.pk = None
+            raise
+
+    def _start_timer(self):
+        self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # Django connections are per thread; don't leak the timer's one
+            connections.close_all()
+
+
+execution_log_buffer = ExecutionLogBuffer()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_execution_log_buffer(**kwargs):
+    execution_log_buffer.flush()
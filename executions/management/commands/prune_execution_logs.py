@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from executions.retention import maintain_execution_logs
+
+
+class Command(BaseCommand):
+    help = 'Roll up execution logs into daily aggregates and drop or archive logs past retention'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.EXECUTION_LOG_RETENTION_DAYS,
+            help='Keep raw logs for this many days'
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Detach old partitions instead of dropping them (PostgreSQL only)'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            summary = maintain_execution_logs(options['days'], archive=options['archive'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        for partition in summary.get('partitions_created', []):
+            self.stdout.write(f'Created partition: {partition}')
+        for partition in summary.get('partitions_removed', []):
+            action = 'Archived' if options['archive'] else 'Dropped'
+            self.stdout.write(f'{action} partition: {partition}')
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Retention completed. Wrote {summary['rollups_refreshed'] + summary['rollups_written']} rollups, "
+                f"deleted {summary['rows_deleted']} rows older than {summary['cutoff']}."
+            )
+        )
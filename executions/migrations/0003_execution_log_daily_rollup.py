@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0003_schedule_next_run_at'),
+        ('executions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutionLogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+                ('avg_execution_time', models.DurationField(blank=True, null=True)),
+                ('p50_execution_time', models.DurationField(blank=True, null=True)),
+                ('p95_execution_time', models.DurationField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='schedules.schedule')),
+            ],
+            options={
+                'db_table': 'execution_log_daily_rollups',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='execution_l_day_dbb9b1_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='executionlogdailyrollup',
+            constraint=models.UniqueConstraint(fields=('schedule', 'day'), name='unique_rollup_schedule_day'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def partition_execution_logs(apps, schema_editor):
+    from executions.partitions import partition_table
+    if schema_editor.connection.vendor == 'postgresql':
+        partition_table(schema_editor.connection)
+
+
+def unpartition_execution_logs(apps, schema_editor):
+    from executions.partitions import unpartition_table
+    if schema_editor.connection.vendor == 'postgresql':
+        unpartition_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0003_execution_log_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_execution_logs, unpartition_execution_logs),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0005_concurrency_limits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='executionlog',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failure', 'Failure'), ('retry', 'Retry'), ('skipped', 'Skipped'), ('coalesced', 'Coalesced')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_misfire_policy'),
+        ('executions', '0006_misfire_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='executionlog',
+            name='attempt',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='ExecutionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('retry', 'Retry'), ('success', 'Success'), ('failure', 'Failure')], default='running', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=1)),
+                ('celery_task_id', models.CharField(max_length=255)),
+                ('claimed_at', models.DateTimeField()),
+                ('lease_expires_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='schedules.schedule')),
+            ],
+            options={
+                'db_table': 'execution_runs',
+                'ordering': ['-scheduled_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='executionlog',
+            name='run',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='attempt_logs', to='executions.executionrun'),
+        ),
+        migrations.AddIndex(
+            model_name='executionrun',
+            index=models.Index(fields=['scheduled_at'], name='execution_r_schedul_0b13f6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='executionrun',
+            constraint=models.UniqueConstraint(fields=('schedule', 'scheduled_at'), name='unique_execution_run'),
+        ),
+    ]
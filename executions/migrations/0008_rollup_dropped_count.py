@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0007_execution_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='executionlogdailyrollup',
+            name='dropped_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
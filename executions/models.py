@@ -3,6 +3,46 @@ from django.utils import timezone
 from schedules.models import Schedule
 
 
+class ExecutionRun(models.Model):
+    """One logical run of a schedule: the claim on a (schedule, fire time) pair.
+
+    Every attempt of the run (retries, redeliveries, deferrals) links its
+    ExecutionLog row here, and duplicates of a claimed run short-circuit.
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('retry', 'Retry'),
+        ('success', 'Success'),
+        ('failure', 'Failure'),
+    ]
+    
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='runs')
+    scheduled_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    attempts = models.PositiveSmallIntegerField(default=1)
+    celery_task_id = models.CharField(max_length=255)
+    claimed_at = models.DateTimeField()
+    lease_expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'execution_runs'
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'scheduled_at'], name='unique_execution_run'),
+        ]
+        indexes = [
+            models.Index(fields=['scheduled_at']),
+        ]
+        ordering = ['-scheduled_at']
+        
+    def __str__(self):
+        return f"{self.schedule} @ {self.scheduled_at} - {self.status}"
+        
+    @property
+    def is_finished(self):
+        return self.status in ['success', 'failure']
+
+
 class ExecutionLog(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -10,10 +50,26 @@ class ExecutionLog(models.Model):
         ('success', 'Success'),
         ('failure', 'Failure'),
         ('retry', 'Retry'),
+        ('skipped', 'Skipped'),
+        ('coalesced', 'Coalesced'),
     ]
+    # Fires dropped without running the task (concurrency cap, misfire policy)
+    DROPPED_STATUSES = ('skipped', 'coalesced')
     
     schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='executions')
+    # On a partitioned PostgreSQL table (partitions.partition_table) the database
+    # enforces UNIQUE (celery_task_id, started_at) instead, since unique
+    # constraints there must include the partition key. Migrations still
+    # describe this plain unique constraint; code looks rows up by task id alone.
     celery_task_id = models.CharField(max_length=255, unique=True)
+    # No database constraint: purge_execution_logs deletes ExecutionRuns by
+    # scheduled_at, independently of their logs, which can outlive them in a
+    # partition that is not yet dropped
+    run = models.ForeignKey(
+        ExecutionRun, null=True, blank=True, on_delete=models.DO_NOTHING,
+        db_constraint=False, related_name='attempt_logs'
+    )
+    attempt = models.PositiveSmallIntegerField(default=1)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     started_at = models.DateTimeField()
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -33,9 +89,12 @@ class ExecutionLog(models.Model):
     def __str__(self):
         return f"{self.schedule} - {self.status} ({self.started_at})"
         
-    def save(self, *args, **kwargs):
+    def compute_execution_time(self):
         if self.completed_at and self.started_at:
             self.execution_time = self.completed_at - self.started_at
+
+    def save(self, *args, **kwargs):
+        self.compute_execution_time()
         super().save(*args, **kwargs)
         
     @property
@@ -46,4 +105,35 @@ class ExecutionLog(models.Model):
         
     @property
     def is_completed(self):
-        return self.status in ['success', 'failure']
\ No newline at end of file
+        return self.status in ['success', 'failure']
+
+class ExecutionLogDailyRollup(models.Model):
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+    total_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    dropped_count = models.PositiveIntegerField(default=0)
+    avg_execution_time = models.DurationField(null=True, blank=True)
+    p50_execution_time = models.DurationField(null=True, blank=True)
+    p95_execution_time = models.DurationField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'execution_log_daily_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'day'], name='unique_rollup_schedule_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.schedule} - {self.day}"
+
+    @property
+    def success_rate(self):
+        if self.total_count:
+            return self.success_count / self.total_count
+        return None
@@ -0,0 +1,185 @@
+"""Monthly range partitioning of ``execution_logs`` on PostgreSQL.
+
+Other backends (SQLite in development) keep the plain table; callers check
+``is_partitioned`` and fall back to row deletes there.
+"""
+import datetime
+import logging
+import re
+
+from django.db import transaction
+
+
+TABLE = 'execution_logs'
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_RE = re.compile(rf'^{TABLE}_p(\d{{4}})(\d{{2}})$')
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(value):
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def partition_name(start):
+    return f'{TABLE}_p{start:%Y%m}'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection, table=TABLE):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            start = datetime.datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.timezone.utc)
+            partitions.append((name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def ensure_partitions(connection, start, end, table=TABLE):
+    """Create the monthly partitions covering [start, end) that are missing.
+
+    PostgreSQL refuses a partition whose range already has rows in the
+    DEFAULT partition, so those rows are moved into the new partition first.
+    """
+    quote = connection.ops.quote_name
+    existing = {name for name, _, _ in list_partitions(connection, table)}
+    created = []
+    current = month_start(start)
+    while current < end:
+        name = partition_name(current)
+        if name not in existing:
+            bounds = [current, add_months(current, 1)]
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT COUNT(*) FROM {quote(DEFAULT_PARTITION)} WHERE started_at >= %s AND started_at < %s',
+                    bounds
+                )
+                stranded = cursor.fetchone()[0]
+                if stranded:
+                    logger.warning('Moving %d rows out of %s into new partition %s', stranded, DEFAULT_PARTITION, name)
+                    # Filled while detached; ATTACH then only has to validate the (now empty) range in DEFAULT
+                    cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS)')
+                    cursor.execute(
+                        f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '
+                        'WHERE started_at >= %s AND started_at < %s RETURNING *) '
+                        f'INSERT INTO {quote(name)} SELECT * FROM moved',
+                        bounds
+                    )
+                    cursor.execute(
+                        f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)',
+                        bounds
+                    )
+                else:
+                    cursor.execute(
+                        f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES FROM (%s) TO (%s)',
+                        bounds
+                    )
+            created.append(name)
+        current = add_months(current, 1)
+    return created
+
+
+def drop_partitions_before(connection, cutoff, archive=False):
+    """Drop (or detach, when archiving) every partition entirely older than cutoff."""
+    removed = []
+    with connection.cursor() as cursor:
+        for name, start, end in list_partitions(connection):
+            if end > cutoff:
+                continue
+            quoted = connection.ops.quote_name(name)
+            if archive:
+                cursor.execute(f'ALTER TABLE {connection.ops.quote_name(TABLE)} DETACH PARTITION {quoted}')
+                cursor.execute(f'ALTER TABLE {quoted} RENAME TO {connection.ops.quote_name(name + "_archive")}')
+            else:
+                cursor.execute(f'DROP TABLE {quoted}')
+            removed.append(name)
+    return removed
+
+
+def partition_table(connection, months_ahead=2):
+    """Convert the plain execution_logs table into a partitioned one, keeping its rows.
+
+    The primary key becomes (id, started_at) and celery_task_id is unique per
+    started_at, as PostgreSQL requires the partition key in unique constraints.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(started_at), MAX(id) FROM {TABLE}')
+        oldest, max_id = cursor.fetchone()
+        statements = [
+            f'CREATE TABLE {TABLE}_partitioned (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (started_at)',
+            f'CREATE SEQUENCE {TABLE}_partitioned_id_seq OWNED BY {TABLE}_partitioned.id',
+            f"ALTER TABLE {TABLE}_partitioned ALTER COLUMN id SET DEFAULT nextval('{TABLE}_partitioned_id_seq')",
+            f'ALTER TABLE {TABLE}_partitioned ADD PRIMARY KEY (id, started_at)',
+            f'ALTER TABLE {TABLE}_partitioned ADD CONSTRAINT {TABLE}_celery_task_id_started_at_uniq '
+            'UNIQUE (celery_task_id, started_at)',
+            f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE}_partitioned DEFAULT',
+        ]
+        for statement in statements:
+            cursor.execute(statement)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    ensure_partitions(connection, oldest or now, add_months(month_start(now), months_ahead + 1), table=f'{TABLE}_partitioned')
+
+    with connection.cursor() as cursor:
+        statements = [
+            f'INSERT INTO {TABLE}_partitioned SELECT * FROM {TABLE}',
+            f"SELECT setval('{TABLE}_partitioned_id_seq', {(max_id or 0) + 1}, false)",
+            f'DROP TABLE {TABLE}',
+            f'ALTER TABLE {TABLE}_partitioned RENAME TO {TABLE}',
+            f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_schedule_id_fk FOREIGN KEY (schedule_id) '
+            f'REFERENCES {quote("schedules")} (id) DEFERRABLE INITIALLY DEFERRED',
+            f'CREATE INDEX execution_l_schedul_da849e_idx ON {TABLE} (schedule_id, started_at)',
+            f'CREATE INDEX execution_l_status_d8a5a0_idx ON {TABLE} (status)',
+            f'CREATE INDEX execution_l_celery__d1954b_idx ON {TABLE} (celery_task_id)',
+        ]
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def unpartition_table(connection):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        statements = [
+            f'CREATE TABLE {TABLE}_plain (LIKE {TABLE} INCLUDING DEFAULTS)',
+            f'INSERT INTO {TABLE}_plain SELECT * FROM {TABLE}',
+            f'ALTER SEQUENCE {TABLE}_partitioned_id_seq OWNED BY {TABLE}_plain.id',
+            f'ALTER TABLE {TABLE}_plain ADD PRIMARY KEY (id)',
+            f'ALTER TABLE {TABLE}_plain ADD CONSTRAINT {TABLE}_celery_task_id_key UNIQUE (celery_task_id)',
+            f'DROP TABLE {TABLE}',
+            f'ALTER TABLE {TABLE}_plain RENAME TO {TABLE}',
+            f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_schedule_id_fk FOREIGN KEY (schedule_id) '
+            f'REFERENCES {quote("schedules")} (id) DEFERRABLE INITIALLY DEFERRED',
+            f'CREATE INDEX execution_l_schedul_da849e_idx ON {TABLE} (schedule_id, started_at)',
+            f'CREATE INDEX execution_l_status_d8a5a0_idx ON {TABLE} (status)',
+            f'CREATE INDEX execution_l_celery__d1954b_idx ON {TABLE} (celery_task_id)',
+        ]
+        for statement in statements:
+            cursor.execute(statement)
@@ -0,0 +1,178 @@
+import datetime
+from itertools import groupby
+
+from django.db import connection
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .aggregates import Percentile, percentile
+from schedules.models import ScheduleChange
+from .models import ExecutionLog, ExecutionLogDailyRollup, ExecutionRun
+from . import partitions
+
+
+ROLLUP_FIELDS = [
+    'total_count', 'success_count', 'failure_count', 'dropped_count',
+    'avg_execution_time', 'p50_execution_time', 'p95_execution_time', 'updated_at',
+]
+
+
+def _logs_between(start, end):
+    logs = ExecutionLog.objects.all()
+    if start is not None:
+        logs = logs.filter(started_at__gte=start)
+    if end is not None:
+        logs = logs.filter(started_at__lt=end)
+    return logs
+
+
+def _aggregate_in_database(logs):
+    executed = ~Q(status__in=ExecutionLog.DROPPED_STATUSES)
+    rows = logs.annotate(day=TruncDate('started_at')).values('schedule_id', 'day').annotate(
+        total_count=Count('id', filter=executed),
+        success_count=Count('id', filter=Q(status='success')),
+        failure_count=Count('id', filter=Q(status='failure')),
+        dropped_count=Count('id', filter=~executed),
+        avg_execution_time=Avg('execution_time', filter=executed),
+        p50_execution_time=Percentile('execution_time', 0.5, filter=executed),
+        p95_execution_time=Percentile('execution_time', 0.95, filter=executed),
+    ).order_by()
+    for row in rows.iterator(chunk_size=2000):
+        yield row
+
+
+def _aggregate_in_python(logs):
+    rows = logs.order_by('schedule_id', 'started_at').values_list(
+        'schedule_id', 'started_at', 'status', 'execution_time'
+    ).iterator(chunk_size=2000)
+
+    def group_key(row):
+        return row[0], timezone.localdate(row[1])
+
+    for (schedule_id, day), group in groupby(rows, key=group_key):
+        total = success = failure = dropped = 0
+        durations = []
+        for _, _, status, execution_time in group:
+            if status in ExecutionLog.DROPPED_STATUSES:
+                dropped += 1
+                continue
+            total += 1
+            success += status == 'success'
+            failure += status == 'failure'
+            if execution_time is not None:
+                durations.append(execution_time)
+        durations.sort()
+        yield {
+            'schedule_id': schedule_id,
+            'day': day,
+            'total_count': total,
+            'success_count': success,
+            'failure_count': failure,
+            'dropped_count': dropped,
+            'avg_execution_time': sum(durations, datetime.timedelta()) / len(durations) if durations else None,
+            'p50_execution_time': percentile(durations, 0.5),
+            'p95_execution_time': percentile(durations, 0.95),
+        }
+
+
+def rollup_execution_logs(start=None, end=None, batch_size=500):
+    """Upsert per-schedule daily rollups for logs started in [start, end)."""
+    logs = _logs_between(start, end)
+    if connection.vendor == 'postgresql':
+        rows = _aggregate_in_database(logs)
+    else:
+        rows = _aggregate_in_python(logs)
+
+    now = timezone.now()
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(ExecutionLogDailyRollup(updated_at=now, **row))
+        if len(batch) >= batch_size:
+            written += _write_rollups(batch)
+            batch = []
+    if batch:
+        written += _write_rollups(batch)
+    return written
+
+
+def _write_rollups(rollups):
+    ExecutionLogDailyRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['schedule', 'day'],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(rollups)
+
+
+def last_rollup_start(before):
+    """Start of the newest day rolled up before ``before``, or None when nothing is.
+
+    Earlier days were final when the previous purge rolled them up; the
+    newest one is redone in case it was cut mid-day.
+    """
+    last_day = ExecutionLogDailyRollup.objects.filter(
+        day__lt=timezone.localdate(before)
+    ).aggregate(last=Max('day'))['last']
+    if last_day is None:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(last_day, datetime.time.min))
+
+
+def purge_execution_logs(cutoff, archive=False, batch_size=1000):
+    """Roll up and then remove every log started before cutoff.
+
+    Partitioned tables lose whole monthly partitions (detached and renamed
+    when archiving); the plain table is deleted from in id batches.
+    """
+    summary = {
+        'cutoff': cutoff.isoformat(),
+        'rollups_written': rollup_execution_logs(last_rollup_start(cutoff), cutoff),
+    }
+    # Run claims only guard against redelivery, which never arrives this late
+    summary['runs_deleted'] = ExecutionRun.objects.filter(scheduled_at__lt=cutoff).delete()[0]
+
+    if partitions.is_partitioned(connection):
+        summary['partitions_removed'] = partitions.drop_partitions_before(connection, cutoff, archive=archive)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(partitions.DEFAULT_PARTITION)} WHERE started_at < %s',
+                [cutoff]
+            )
+            summary['rows_deleted'] = cursor.rowcount
+        return summary
+
+    if archive:
+        raise ValueError('Archiving requires the partitioned PostgreSQL layout')
+
+    deleted = 0
+    while True:
+        ids = list(ExecutionLog.objects.filter(started_at__lt=cutoff).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += ExecutionLog.objects.filter(id__in=ids).delete()[0]
+    summary['rows_deleted'] = deleted
+    return summary
+
+
+def maintain_execution_logs(retention_days, archive=False, months_ahead=2):
+    """Daily job: pre-create partitions, roll up yesterday and purge past retention."""
+    now = timezone.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    summary = {}
+
+    if partitions.is_partitioned(connection):
+        summary['partitions_created'] = partitions.ensure_partitions(
+            connection, now, partitions.add_months(partitions.month_start(now), months_ahead + 1)
+        )
+
+    summary['rollups_refreshed'] = rollup_execution_logs(today - datetime.timedelta(days=1), today)
+    # Dispatchers prune their change feed hourly; this clears what beat-mode
+    # installs wrote before the feed was limited to the native dispatchers
+    summary['schedule_changes_deleted'] = ScheduleChange.objects.filter(
+        created_at__lt=now - datetime.timedelta(days=1)
+    ).delete()[0]
+    summary.update(purge_execution_logs(today - datetime.timedelta(days=retention_days), archive=archive))
+    return summary
@@ -0,0 +1,86 @@
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+CLAIMED = 'claimed'
+DUPLICATE = 'duplicate'
+FINISHED = 'finished'
+
+
+def claim_lease():
+    return timezone.now() + datetime.timedelta(seconds=settings.EXECUTION_CLAIM_TTL)
+
+
+def claim_run(schedule, scheduled_at, celery_task_id, retries=0, claimed_by=None):
+    """Claim the run of ``schedule`` due at ``scheduled_at`` for one task attempt.
+
+    Returns ``(run, verdict)``. ``CLAIMED`` means the caller executes the body
+    as attempt ``run.attempts``. A run waiting for a retry is taken over by
+    its owning task id, or by a deferred/delayed re-publish that carries that
+    id as ``claimed_by``. A run whose lease expired (its worker died) can be
+    taken over by anyone. Either way the takeover is a new attempt.
+    ``FINISHED`` and ``DUPLICATE`` mean another delivery already completed
+    the run or is running it, and the caller must not run it again.
+    """
+    from .models import ExecutionRun
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            run = ExecutionRun.objects.create(
+                schedule=schedule,
+                scheduled_at=scheduled_at,
+                celery_task_id=celery_task_id,
+                attempts=retries + 1,
+                claimed_at=now,
+                lease_expires_at=claim_lease()
+            )
+        return run, CLAIMED
+    except IntegrityError:
+        run = ExecutionRun.objects.get(schedule=schedule, scheduled_at=scheduled_at)
+
+    if run.is_finished:
+        return run, FINISHED
+
+    handed_over = run.status == 'retry' and run.celery_task_id in (celery_task_id, claimed_by)
+    if not handed_over and run.lease_expires_at > now:
+        return run, DUPLICATE
+
+    # Conditional on the state just read, so only one delivery wins the takeover
+    taken = ExecutionRun.objects.filter(
+        pk=run.pk, attempts=run.attempts, celery_task_id=run.celery_task_id
+    ).update(
+        status='running',
+        attempts=F('attempts') + 1,
+        celery_task_id=celery_task_id,
+        claimed_at=now,
+        lease_expires_at=claim_lease()
+    )
+    if not taken:
+        return run, DUPLICATE
+    run.refresh_from_db()
+    return run, CLAIMED
+
+
+def finish_run(run, status):
+    from .models import ExecutionRun
+
+    run.status = status
+    if run.is_finished:
+        run.completed_at = timezone.now()
+    ExecutionRun.objects.filter(pk=run.pk, celery_task_id=run.celery_task_id).update(
+        status=run.status, completed_at=run.completed_at
+    )
+
+
+def abandon_run(schedule, scheduled_at, celery_task_id):
+    """Close a run its owning task gave up on, e.g. a retry dropped by the concurrency cap."""
+    from .models import ExecutionRun
+
+    ExecutionRun.objects.filter(
+        schedule=schedule, scheduled_at=scheduled_at, celery_task_id=celery_task_id, status='retry'
+    ).update(status='failure', completed_at=timezone.now())
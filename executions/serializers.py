@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from .models import ExecutionLog
+from .stats import BUCKETS
 
 
 class ExecutionLogSerializer(serializers.ModelSerializer):
@@ -54,4 +55,28 @@ class ExecutionLogDetailSerializer(serializers.ModelSerializer):
     
     @extend_schema_field(serializers.BooleanField())
     def get_is_completed(self, obj):
-        return obj.is_completed
\ No newline at end of file
+        return obj.is_completed
+
+class ExecutionStatsQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    bucket = serializers.ChoiceField(choices=BUCKETS, required=False)
+
+
+class ExecutionStatsSerializer(serializers.Serializer):
+    bucket = serializers.DateTimeField(required=False)
+    total = serializers.IntegerField()
+    dropped = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    success_rate = serializers.FloatField(allow_null=True)
+    mean_seconds = serializers.FloatField(allow_null=True)
+    p50_seconds = serializers.FloatField(allow_null=True)
+    p95_seconds = serializers.FloatField(allow_null=True)
+    max_seconds = serializers.FloatField(allow_null=True)
+    last_success_at = serializers.DateTimeField(allow_null=True)
+    last_failure_at = serializers.DateTimeField(allow_null=True)
+
+
+class TaskDefinitionStatsSerializer(ExecutionStatsSerializer):
+    task_definition_id = serializers.IntegerField()
+    task_definition_name = serializers.CharField()
@@ -0,0 +1,102 @@
+from itertools import groupby
+
+from django.db import connection
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import Trunc
+
+from .aggregates import Percentile, percentile
+from .models import ExecutionLog
+
+
+BUCKETS = ['hour', 'day', 'week', 'month']
+STATUSES = [status for status, _ in ExecutionLog.STATUS_CHOICES]
+# Dropped fires never ran: they are counted apart and kept out of rates and durations
+EXECUTED = ~Q(status__in=ExecutionLog.DROPPED_STATUSES)
+
+
+def _seconds(value):
+    return value.total_seconds() if value is not None else None
+
+
+def filter_window(logs, since=None, until=None):
+    if since is not None:
+        logs = logs.filter(started_at__gte=since)
+    if until is not None:
+        logs = logs.filter(started_at__lt=until)
+    return logs
+
+
+def execution_stats(logs, group_by=(), bucket=None):
+    """Aggregate an ExecutionLog queryset into one row per group (and time bucket).
+
+    Counts, mean/max and last success/failure come from a single GROUP BY
+    query; PostgreSQL computes the percentiles in it too, other backends
+    stream the sorted durations once more. ``total``, ``success_rate`` and
+    the durations cover executed runs only; skipped and coalesced fires are
+    reported as ``dropped``.
+    """
+    group_fields = list(group_by)
+    if bucket:
+        logs = logs.annotate(bucket=Trunc('started_at', bucket))
+        group_fields.append('bucket')
+
+    aggregates = {
+        'total': Count('id', filter=EXECUTED),
+        'dropped': Count('id', filter=~EXECUTED),
+        'mean_execution_time': Avg('execution_time', filter=EXECUTED),
+        'max_execution_time': Max('execution_time', filter=EXECUTED),
+        'last_success_at': Max('started_at', filter=Q(status='success')),
+        'last_failure_at': Max('started_at', filter=Q(status='failure')),
+    }
+    for status in STATUSES:
+        aggregates[f'{status}_count'] = Count('id', filter=Q(status=status))
+
+    use_database_percentiles = connection.vendor == 'postgresql'
+    if use_database_percentiles:
+        aggregates['p50_execution_time'] = Percentile('execution_time', 0.5, filter=EXECUTED)
+        aggregates['p95_execution_time'] = Percentile('execution_time', 0.95, filter=EXECUTED)
+
+    if group_fields:
+        rows = list(logs.values(*group_fields).annotate(**aggregates).order_by(*group_fields))
+    else:
+        rows = [logs.aggregate(**aggregates)]
+
+    if not use_database_percentiles:
+        _add_percentiles(logs, group_fields, rows)
+
+    return [_format_row(row, group_fields) for row in rows if row['total'] or row['dropped']]
+
+
+def _add_percentiles(logs, group_fields, rows):
+    by_key = {tuple(row[field] for field in group_fields): row for row in rows}
+    for row in rows:
+        row['p50_execution_time'] = row['p95_execution_time'] = None
+
+    durations = logs.filter(EXECUTED, execution_time__isnull=False).order_by(
+        *group_fields, 'execution_time'
+    ).values_list(*group_fields, 'execution_time').iterator(chunk_size=2000)
+
+    width = len(group_fields)
+    for key, group in groupby(durations, key=lambda item: tuple(item[:width])):
+        values = [item[width] for item in group]
+        row = by_key.get(key)
+        if row is not None:
+            row['p50_execution_time'] = percentile(values, 0.5)
+            row['p95_execution_time'] = percentile(values, 0.95)
+
+
+def _format_row(row, group_fields):
+    result = {field: row[field] for field in group_fields}
+    result.update({
+        'total': row['total'],
+        'dropped': row['dropped'],
+        'by_status': {status: row[f'{status}_count'] for status in STATUSES},
+        'success_rate': row['success_count'] / row['total'] if row['total'] else None,
+        'mean_seconds': _seconds(row['mean_execution_time']),
+        'p50_seconds': _seconds(row['p50_execution_time']),
+        'p95_seconds': _seconds(row['p95_execution_time']),
+        'max_seconds': _seconds(row['max_execution_time']),
+        'last_success_at': row['last_success_at'],
+        'last_failure_at': row['last_failure_at'],
+    })
+    return result
@@ -0,0 +1,11 @@
+from celery import shared_task
+from django.conf import settings
+
+
+@shared_task
+def maintain_execution_logs_task():
+    from .retention import maintain_execution_logs
+    return maintain_execution_logs(
+        settings.EXECUTION_LOG_RETENTION_DAYS,
+        archive=settings.EXECUTION_LOG_ARCHIVE_PARTITIONS
+    )
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -176,9 +177,110 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# Lets the Redis broker honour TaskDefinition.priority (0 is the highest)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+    # Countdown messages stay unacknowledged on a worker until due; keep this
+    # above the longest countdown (Send Email's 3600 s delay) or Redis redelivers them
+    'visibility_timeout': config('CELERY_VISIBILITY_TIMEOUT', default=7200, cast=int),
+}
+CELERY_BEAT_SCHEDULE = {
+    'maintain-execution-logs': {
+        'task': 'executions.tasks.maintain_execution_logs_task',
+        'schedule': crontab(minute=15, hour=3),
+    },
+}
+
+# 'running' and 'completion' write synchronously; 'batched' buffers finished
+# logs per worker process and may lose the unflushed batch on a hard crash
+EXECUTION_LOG_MODE = config('EXECUTION_LOG_MODE', default='running')
+# Raw logs older than this are rolled up per day and removed; on PostgreSQL
+# whole monthly partitions are dropped, or detached when archiving
+EXECUTION_LOG_RETENTION_DAYS = config('EXECUTION_LOG_RETENTION_DAYS', default=90, cast=int)
+EXECUTION_LOG_ARCHIVE_PARTITIONS = config('EXECUTION_LOG_ARCHIVE_PARTITIONS', default=False, cast=bool)
+EXECUTION_LOG_BATCH_SIZE = config('EXECUTION_LOG_BATCH_SIZE', default=100, cast=int)
+EXECUTION_LOG_FLUSH_INTERVAL = config('EXECUTION_LOG_FLUSH_INTERVAL', default=5.0, cast=float)
+
+SCHEDULE_BULK_MAX_ITEMS = config('SCHEDULE_BULK_MAX_ITEMS', default=500, cast=int)
+
+TASK_REGISTRY_TTL = config('TASK_REGISTRY_TTL', default=60, cast=int)
+
+CRON_CACHE_SIZE = config('CRON_CACHE_SIZE', default=1024, cast=int)
+
+# 'beat' fires schedules through django_celery_beat; 'native' (one process)
+# and 'sharded' (any number of processes) leave the mirrored PeriodicTasks
+# disabled and `manage.py run_dispatcher` fires them
+SCHEDULE_DISPATCHER = config('SCHEDULE_DISPATCHER', default='beat')
+SCHEDULE_DISPATCH_BATCH_SIZE = config('SCHEDULE_DISPATCH_BATCH_SIZE', default=500, cast=int)
+SCHEDULE_DISPATCH_POLL_INTERVAL = config('SCHEDULE_DISPATCH_POLL_INTERVAL', default=1.0, cast=float)
+# Must be identical on every sharded dispatcher
+SCHEDULE_DISPATCH_SHARDS = config('SCHEDULE_DISPATCH_SHARDS', default=64, cast=int)
+SCHEDULE_DISPATCH_LEASE_TTL = config('SCHEDULE_DISPATCH_LEASE_TTL', default=15, cast=int)
+
+# Caps enforced by workers before a run starts; 0 means unlimited and
+# superusers are exempt from the per-user caps
+USER_MAX_CONCURRENT_RUNS = config('USER_MAX_CONCURRENT_RUNS', default=0, cast=int)
+USER_MAX_QUEUED_RUNS = config('USER_MAX_QUEUED_RUNS', default=0, cast=int)
+# 'redis' shares the counters between workers; 'memory' is per process
+CONCURRENCY_STORE = config('CONCURRENCY_STORE', default='redis')
+CONCURRENCY_REDIS_URL = config('CONCURRENCY_REDIS_URL', default=CELERY_BROKER_URL)
+CONCURRENCY_DEFER_COUNTDOWN = config('CONCURRENCY_DEFER_COUNTDOWN', default=30, cast=int)
+CONCURRENCY_SLOT_TTL = config('CONCURRENCY_SLOT_TTL', default=3600, cast=int)
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Fires later than this (unless a schedule sets its own grace) count as misfires
+SCHEDULE_MISFIRE_GRACE_SECONDS = config('SCHEDULE_MISFIRE_GRACE_SECONDS', default=60, cast=int)
+
+# How long a run's claim protects it from duplicate deliveries; keep it above
+# the longest task so a live run is never taken over
+EXECUTION_CLAIM_TTL = config('EXECUTION_CLAIM_TTL', default=3600, cast=int)
+
+# Data Processing reads source_path files from under this directory only
+DATA_PROCESSING_ROOT = config('DATA_PROCESSING_ROOT', default=str(BASE_DIR / 'data'))
+# Values held in memory at once while streaming a dataset
+DATA_PROCESSING_CHUNK_SIZE = config('DATA_PROCESSING_CHUNK_SIZE', default=65536, cast=int)
+# Relative error of the median and percentiles reported by complex processing
+DATA_PROCESSING_QUANTILE_ACCURACY = config('DATA_PROCESSING_QUANTILE_ACCURACY', default=0.01, cast=float)
+# Upper bound on a run's workers parameter (processes forked by one task)
+DATA_PROCESSING_MAX_WORKERS = config('DATA_PROCESSING_MAX_WORKERS', default=os.cpu_count() or 1, cast=int)
+
+# File Backup only reads from / writes to paths under these directories
+BACKUP_SOURCE_ROOT = config('BACKUP_SOURCE_ROOT', default='/tmp')
+BACKUP_DESTINATION_ROOT = config('BACKUP_DESTINATION_ROOT', default='/backup')
+BACKUP_COMPRESSION_LEVEL = config('BACKUP_COMPRESSION_LEVEL', default=6, cast=int)
+# Upper bound on a run's parallelism parameter (copier threads per task)
+BACKUP_MAX_PARALLELISM = config('BACKUP_MAX_PARALLELISM', default=32, cast=int)
+
+# Database Cleanup deletes at most this many rows per transaction
+DATABASE_CLEANUP_BATCH_SIZE = config('DATABASE_CLEANUP_BATCH_SIZE', default=5000, cast=int)
+# Pause between batches (seconds) so deletes leave room for worker inserts
+DATABASE_CLEANUP_PAUSE = config('DATABASE_CLEANUP_PAUSE', default=0.05, cast=float)
+# A run stops after this many seconds and the next run resumes where it left off
+DATABASE_CLEANUP_MAX_RUNTIME = config('DATABASE_CLEANUP_MAX_RUNTIME', default=600, cast=int)
+
+# Report Generation writes its files under this directory
+REPORTS_ROOT = config('REPORTS_ROOT', default=str(BASE_DIR / 'reports'))
+# Execution log rows fetched per round trip while a report streams
+REPORT_CHUNK_SIZE = config('REPORT_CHUNK_SIZE', default=2000, cast=int)
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = 'noreply@insighthub.com'
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+
+# tasks.mail.PooledEmailBackend keeps one SMTP connection per worker process
+EMAIL_POOL_IDLE_TIMEOUT = config('EMAIL_POOL_IDLE_TIMEOUT', default=30, cast=float)
+EMAIL_POOL_MAX_MESSAGES = config('EMAIL_POOL_MAX_MESSAGES', default=100, cast=int)
+
+# Emails sent within this many seconds of each other share one send_messages
+# call (thread/gevent worker pools only); 0 sends each one as it comes
+EMAIL_BATCH_WINDOW = config('EMAIL_BATCH_WINDOW', default=0.0, cast=float)
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=50, cast=int)
 
 LOGGING = {
     'version': 1,
@@ -0,0 +1,241 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django_celery_beat.models import CrontabSchedule, PeriodicTask, PeriodicTasks
+from rest_framework import status
+
+from .models import Schedule, ScheduleChange
+from .serializers import ScheduleCreateSerializer, ScheduleUpdateSerializer, ScheduleSerializer
+
+
+SCHEDULE_LIMIT_MESSAGE = 'Regular users cannot have more than 5 active jobs'
+CRONTAB_FIELDS = ('minute', 'hour', 'day_of_month', 'month_of_year', 'day_of_week')
+
+
+def crontab_key(cron_expression):
+    return tuple(cron_expression.split())
+
+
+def resolve_crontabs(cron_expressions):
+    """Map each cron expression to a CrontabSchedule with one select and one bulk insert."""
+    keys = {crontab_key(expression) for expression in cron_expressions}
+    if not keys:
+        return {}
+
+    crontabs = {}
+    query = reduce(or_, [Q(**dict(zip(CRONTAB_FIELDS, key))) for key in keys])
+    for crontab in CrontabSchedule.objects.filter(query).order_by('id'):
+        crontabs.setdefault(tuple(getattr(crontab, field) for field in CRONTAB_FIELDS), crontab)
+
+    missing = [CrontabSchedule(**dict(zip(CRONTAB_FIELDS, key))) for key in keys if key not in crontabs]
+    for crontab in CrontabSchedule.objects.bulk_create(missing):
+        crontabs[tuple(getattr(crontab, field) for field in CRONTAB_FIELDS)] = crontab
+
+    return {expression: crontabs[crontab_key(expression)] for expression in cron_expressions}
+
+
+def periodic_task_kwargs(schedule):
+    return json.dumps({
+        'schedule_id': schedule.id,
+        'parameters': schedule.parameters
+    })
+
+
+def active_counts(user_ids):
+    rows = Schedule.objects.filter(user_id__in=user_ids, is_active=True).values('user_id').annotate(total=Count('id'))
+    return {row['user_id']: row['total'] for row in rows}
+
+
+def bulk_create_schedules(schedules):
+    """Insert validated, unsaved schedules with their crontabs and periodic tasks."""
+    now = timezone.now()
+    for schedule in schedules:
+        schedule.next_run_at = schedule.compute_next_run_at(now)
+
+    with transaction.atomic():
+        created = Schedule.objects.bulk_create(schedules)
+        crontabs = resolve_crontabs([schedule.cron_expression for schedule in created])
+        PeriodicTask.objects.bulk_create([
+            PeriodicTask(
+                name=f"schedule_{schedule.id}",
+                crontab=crontabs[schedule.cron_expression],
+                task=schedule.task_definition.celery_task_name,
+                kwargs=periodic_task_kwargs(schedule),
+                enabled=schedule.beat_enabled,
+                **schedule.task_definition.periodic_task_routing()
+            )
+            for schedule in created
+        ])
+        PeriodicTasks.update_changed()
+        ScheduleChange.record([schedule.id for schedule in created])
+
+    for schedule in created:
+        schedule._remember_loaded_values()
+    return created
+
+
+def bulk_update_schedules(schedules):
+    """Write validated changes of loaded schedules and sync their periodic tasks."""
+    now = timezone.now()
+    for schedule in schedules:
+        schedule.next_run_at = schedule.compute_next_run_at(now)
+        schedule.updated_at = now
+
+    with transaction.atomic():
+        Schedule.objects.bulk_update(
+            schedules, [
+                'cron_expression', 'parameters', 'is_active', 'misfire_policy', 'misfire_grace_seconds',
+                'next_run_at', 'updated_at'
+            ]
+        )
+        by_name = {f"schedule_{schedule.id}": schedule for schedule in schedules}
+        periodic_tasks = list(PeriodicTask.objects.filter(name__in=list(by_name)))
+        crontabs = resolve_crontabs([by_name[task.name].cron_expression for task in periodic_tasks])
+        for periodic_task in periodic_tasks:
+            schedule = by_name[periodic_task.name]
+            periodic_task.crontab = crontabs[schedule.cron_expression]
+            periodic_task.kwargs = periodic_task_kwargs(schedule)
+            periodic_task.enabled = schedule.beat_enabled
+        PeriodicTask.objects.bulk_update(periodic_tasks, ['crontab', 'kwargs', 'enabled'])
+        PeriodicTasks.update_changed()
+        ScheduleChange.record([schedule.id for schedule in schedules])
+
+    for schedule in schedules:
+        schedule._remember_loaded_values()
+    return schedules
+
+
+def bulk_delete_schedules(ids):
+    ids = list(ids)
+    with transaction.atomic():
+        # A queryset delete still sends beat's delete signals, unlike _raw_delete
+        PeriodicTask.objects.filter(name__in=[f"schedule_{pk}" for pk in ids]).delete()
+        Schedule.objects.filter(id__in=ids).delete()
+        PeriodicTasks.update_changed()
+    return ids
+
+
+def sync_beat_tasks():
+    """Align the mirrored PeriodicTasks' enabled flags with SCHEDULE_DISPATCHER."""
+    mirrored = PeriodicTask.objects.filter(name__startswith='schedule_')
+    with transaction.atomic():
+        mirrored.update(enabled=False)
+        if settings.SCHEDULE_DISPATCHER == 'beat':
+            active_ids = Schedule.objects.filter(is_active=True).values_list('id', flat=True)
+            mirrored.filter(name__in=[f"schedule_{pk}" for pk in active_ids]).update(enabled=True)
+        PeriodicTasks.update_changed()
+    return mirrored.filter(enabled=True).count()
+
+
+def _error(index, errors, schedule_id=None):
+    return {'index': index, 'id': schedule_id, 'status': 'error', 'errors': errors}
+
+
+def _result(index, schedule, result_status, context):
+    return {
+        'index': index,
+        'id': schedule.id,
+        'status': result_status,
+        'schedule': ScheduleSerializer(schedule, context=context).data,
+    }
+
+
+def bulk_response_status(results, success_status):
+    failed = sum(1 for result in results if result['status'] == 'error')
+    if not failed:
+        return success_status
+    if failed == len(results):
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_207_MULTI_STATUS
+
+
+def create_many(items, user, context):
+    context = {**context, 'bulk': True}
+    remaining = None
+    if not user.is_superuser:
+        remaining = 5 - active_counts([user.id]).get(user.id, 0)
+
+    results = {}
+    pending = []
+    for index, item in enumerate(items):
+        serializer = ScheduleCreateSerializer(data=item, context=context)
+        if not serializer.is_valid():
+            results[index] = _error(index, serializer.errors)
+            continue
+        # Inactive schedules do not count against the limit
+        if remaining is not None and serializer.validated_data.get('is_active', True):
+            if remaining <= 0:
+                results[index] = _error(index, {'non_field_errors': [SCHEDULE_LIMIT_MESSAGE]})
+                continue
+            remaining -= 1
+        pending.append((index, Schedule(user=user, **serializer.validated_data)))
+
+    created = bulk_create_schedules([schedule for _, schedule in pending])
+    for (index, _), schedule in zip(pending, created):
+        results[index] = _result(index, schedule, 'created', context)
+    return [results[index] for index in sorted(results)]
+
+
+def update_many(items, queryset, context):
+    context = {**context, 'bulk': True}
+    ids = [item.get('id') for item in items]
+    valid_ids = [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+    instances = {schedule.id: schedule for schedule in queryset.filter(id__in=valid_ids)}
+
+    results = {}
+    validated = []
+    seen = set()
+    for index, item in enumerate(items):
+        schedule_id = item.get('id')
+        instance = instances.get(schedule_id) if schedule_id in valid_ids else None
+        if instance is None:
+            results[index] = _error(index, {'id': ['Schedule not found']}, schedule_id)
+            continue
+        if schedule_id in seen:
+            results[index] = _error(index, {'id': ['Duplicate schedule id in request']}, schedule_id)
+            continue
+        seen.add(schedule_id)
+        data = {key: value for key, value in item.items() if key != 'id'}
+        serializer = ScheduleUpdateSerializer(instance, data=data, partial=True, context=context)
+        if not serializer.is_valid():
+            results[index] = _error(index, serializer.errors, schedule_id)
+            continue
+        validated.append((index, instance, serializer.validated_data))
+
+    # Deactivations in the batch free slots before activations claim them
+    counts = active_counts({instance.user_id for _, instance, _ in validated})
+    for _, instance, data in validated:
+        if instance.is_active and data.get('is_active') is False:
+            counts[instance.user_id] -= 1
+
+    pending = []
+    for index, instance, data in validated:
+        activating = not instance.is_active and data.get('is_active') is True
+        if activating and not instance.user.is_superuser:
+            if counts.get(instance.user_id, 0) >= 5:
+                results[index] = _error(index, {'non_field_errors': [SCHEDULE_LIMIT_MESSAGE]}, instance.id)
+                continue
+            counts[instance.user_id] = counts.get(instance.user_id, 0) + 1
+        for attr, value in data.items():
+            setattr(instance, attr, value)
+        pending.append((index, instance))
+
+    bulk_update_schedules([instance for _, instance in pending])
+    for index, instance in pending:
+        results[index] = _result(index, instance, 'updated', context)
+    return [results[index] for index in sorted(results)]
+
+
+def delete_many(ids, queryset):
+    found = set(queryset.filter(id__in=ids).values_list('id', flat=True))
+    bulk_delete_schedules(found)
+    return [
+        {'index': index, 'id': pk, 'status': 'deleted'} if pk in found
+        else _error(index, {'id': ['Schedule not found']}, pk)
+        for index, pk in enumerate(ids)
+    ]
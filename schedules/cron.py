@@ -0,0 +1,74 @@
+import copy
+import datetime
+from functools import lru_cache
+
+from croniter import croniter
+from croniter.croniter import CroniterError
+from django.conf import settings
+from django.utils import timezone
+
+
+class CompiledCron:
+    """A cron expression parsed once and reusable for any start time."""
+
+    def __init__(self, expression):
+        self.expression = expression
+        self._template = croniter(expression, 0, ret_type=datetime.datetime)
+
+    def _iterator(self, start):
+        cron = copy.copy(self._template)
+        cron.set_current(start or timezone.now(), force=True)
+        return cron
+
+    @staticmethod
+    def _make_aware(value):
+        if timezone.is_naive(value):
+            return timezone.make_aware(value, timezone.get_current_timezone())
+        return value
+
+    def next_run(self, start=None):
+        return self._make_aware(self._iterator(start).get_next(datetime.datetime))
+
+    def previous_run(self, start=None):
+        return self._make_aware(self._iterator(start).get_prev(datetime.datetime))
+
+    def next_runs(self, count, start=None):
+        cron = self._iterator(start)
+        return [self._make_aware(cron.get_next(datetime.datetime)) for _ in range(count)]
+
+
+@lru_cache(maxsize=getattr(settings, 'CRON_CACHE_SIZE', 1024))
+def compile_cron(expression):
+    return CompiledCron(expression)
+
+
+def is_valid_cron(expression):
+    try:
+        compile_cron(expression)
+    except CroniterError:
+        return False
+    return True
+
+
+def next_run_time(expression, start=None):
+    return compile_cron(expression).next_run(start)
+
+
+def next_run_times(expression, count, start=None):
+    return compile_cron(expression).next_runs(count, start)
+
+
+def cron_cache_info():
+    info = compile_cron.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_cron_cache():
+    compile_cron.cache_clear()
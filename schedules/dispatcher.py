@@ -0,0 +1,476 @@
+import datetime
+import heapq
+import itertools
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F, Max, Q
+from django.utils import timezone
+from kombu.exceptions import KombuError
+
+from tasks.registry import task_registry
+from .cron import compile_cron
+from .misfire import MISFIRE_RUN_ALL, MISFIRE_RUN_ONCE, catch_up, grace_period
+from .models import DispatcherNode, DispatchShardLease, Schedule, ScheduleChange, ScheduleFire
+
+logger = logging.getLogger(__name__)
+
+
+def to_datetime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+class DispatchEntry:
+    __slots__ = (
+        'schedule_id', 'cron_expression', 'task_name', 'parameters',
+        'misfire_policy', 'misfire_grace_seconds', 'fire_at', 'generation'
+    )
+
+    def __init__(self, schedule_id, cron_expression, task_name, parameters,
+                 misfire_policy=MISFIRE_RUN_ONCE, misfire_grace_seconds=None):
+        self.schedule_id = schedule_id
+        self.cron_expression = cron_expression
+        self.task_name = task_name
+        self.parameters = parameters
+        self.misfire_policy = misfire_policy
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.fire_at = None
+        self.generation = 0
+
+    def kwargs(self, fire_at):
+        return {
+            'schedule_id': self.schedule_id,
+            'parameters': self.parameters,
+            'scheduled_at': to_datetime(fire_at).isoformat(),
+        }
+
+
+class FireQueue:
+    """Min-heap of (fire timestamp, schedule id, generation).
+
+    Every push stamps the entry with a fresh generation instead of searching
+    the heap for its old position; stale heap items are dropped when popped
+    and the heap is rebuilt once they outnumber the live entries.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self._heap = []
+        self._generations = itertools.count(1)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, entries):
+        self.entries = {entry.schedule_id: entry for entry in entries}
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [
+            (entry.fire_at, entry.schedule_id, entry.generation)
+            for entry in self.entries.values() if entry.fire_at is not None
+        ]
+        heapq.heapify(self._heap)
+
+    def push(self, entry):
+        entry.generation = next(self._generations)
+        self.entries[entry.schedule_id] = entry
+        heapq.heappush(self._heap, (entry.fire_at, entry.schedule_id, entry.generation))
+        if len(self._heap) > 2 * len(self.entries) + 64:
+            self._rebuild()
+
+    def reschedule(self, entry, fire_at):
+        entry.fire_at = fire_at
+        entry.generation = next(self._generations)
+        heapq.heappush(self._heap, (fire_at, entry.schedule_id, entry.generation))
+
+    def remove(self, schedule_id):
+        return self.entries.pop(schedule_id, None)
+
+    def peek(self):
+        while self._heap:
+            fire_at, schedule_id, generation = self._heap[0]
+            entry = self.entries.get(schedule_id)
+            if entry is not None and entry.generation == generation:
+                return fire_at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now, limit):
+        due = []
+        while len(due) < limit and self.peek() is not None and self._heap[0][0] <= now:
+            _, schedule_id, _ = heapq.heappop(self._heap)
+            due.append(self.entries[schedule_id])
+        return due
+
+
+class NextFireCache:
+    """Next fire timestamps memoized per (expression, start) for one pass.
+
+    Schedules sharing an expression come due together, so one croniter step
+    serves all of them.
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def after(self, expression, start):
+        key = (expression, start)
+        value = self._values.get(key)
+        if value is None:
+            value = self._values[key] = compile_cron(expression).next_run(to_datetime(start)).timestamp()
+        return value
+
+
+class CelerySender:
+    """Publish a batch of due schedules over one broker connection."""
+
+    def __init__(self, app=None):
+        if app is None:
+            from insighthub.celery import app
+        self.app = app
+
+    def routing(self, task_name):
+        task_definition = task_registry.by_task_name(task_name)
+        return task_definition.routing_options() if task_definition is not None else {}
+
+    def __call__(self, batch):
+        routes = {}
+        with self.app.producer_or_acquire() as producer:
+            for entry, fire_at in batch:
+                if entry.task_name not in routes:
+                    routes[entry.task_name] = self.routing(entry.task_name)
+                self.app.send_task(
+                    entry.task_name, kwargs=entry.kwargs(fire_at), producer=producer, **routes[entry.task_name]
+                )
+
+
+class LoggingSender:
+    """Log due schedules instead of publishing them, for local dry runs."""
+
+    def __call__(self, batch):
+        for entry, fire_at in batch:
+            logger.info('Would fire schedule %s (%s) for %s', entry.schedule_id, entry.task_name,
+                        to_datetime(fire_at).isoformat())
+
+
+class ScheduleDispatcher:
+    """Fires active schedules straight from the Schedule table.
+
+    The full table is read once at startup; afterwards only schedules named
+    in the ScheduleChange feed are reloaded.
+    """
+
+    # Change ids are allocated before commit, so a row can become visible
+    # after a higher id was already read; recent rows are re-read for a while.
+    change_lookback = datetime.timedelta(seconds=30)
+    change_retention = datetime.timedelta(hours=1)
+    prune_every = 600.0
+
+    def __init__(self, sender=None, batch_size=None, poll_interval=None, clock=time.time):
+        self.sender = sender or CelerySender()
+        self.batch_size = batch_size or settings.SCHEDULE_DISPATCH_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.SCHEDULE_DISPATCH_POLL_INTERVAL
+        self.clock = clock
+        self.queue = FireQueue()
+        self.change_watermark = 0
+        self._recent_changes = {}
+        self._last_prune = 0.0
+
+    def schedules(self):
+        return Schedule.objects.filter(is_active=True).values_list(
+            'id', 'cron_expression', 'task_definition__celery_task_name', 'parameters',
+            'misfire_policy', 'misfire_grace_seconds'
+        )
+
+    def load(self):
+        self.change_watermark = ScheduleChange.objects.aggregate(last=Max('id'))['last'] or 0
+        self._recent_changes = dict(ScheduleChange.objects.filter(
+            id__lte=self.change_watermark, created_at__gte=timezone.now() - self.change_lookback
+        ).values_list('id', 'created_at'))
+        self.queue.load(self.build_entries(self.schedules(), self.clock()))
+        logger.info('Dispatcher loaded %d active schedules', len(self.queue))
+        return len(self.queue)
+
+    def build_entries(self, rows, start):
+        next_fire = NextFireCache()
+        entries = []
+        for row in rows.iterator(chunk_size=5000):
+            entry = DispatchEntry(*row)
+            entry.fire_at = next_fire.after(entry.cron_expression, start)
+            entries.append(entry)
+        return entries
+
+    def poll_changes(self):
+        cutoff = timezone.now() - self.change_lookback
+        changes = ScheduleChange.objects.filter(
+            Q(id__gt=self.change_watermark) | Q(created_at__gte=cutoff)
+        ).values_list('id', 'schedule_id', 'created_at')
+
+        changed = set()
+        for change_id, schedule_id, created_at in changes:
+            if change_id in self._recent_changes:
+                continue
+            self._recent_changes[change_id] = created_at
+            self.change_watermark = max(self.change_watermark, change_id)
+            changed.add(schedule_id)
+        self._recent_changes = {
+            change_id: created_at for change_id, created_at in self._recent_changes.items() if created_at >= cutoff
+        }
+        if changed:
+            self.reload(changed)
+        return len(changed)
+
+    def reload(self, schedule_ids):
+        now = self.clock()
+        next_fire = NextFireCache()
+        found = set()
+        for row in self.schedules().filter(id__in=schedule_ids):
+            entry = DispatchEntry(*row)
+            current = self.queue.entries.get(entry.schedule_id)
+            if current is not None and current.cron_expression == entry.cron_expression:
+                entry.fire_at = current.fire_at
+            else:
+                entry.fire_at = next_fire.after(entry.cron_expression, now)
+            self.queue.push(entry)
+            found.add(entry.schedule_id)
+        # Deleted or deactivated schedules drop out of the heap
+        for schedule_id in set(schedule_ids) - found:
+            self.queue.remove(schedule_id)
+
+    def dispatch_due(self):
+        now = self.clock()
+        next_fire = NextFireCache()
+        dispatched = 0
+        while True:
+            due = self.queue.pop_due(now, self.batch_size)
+            if not due:
+                return dispatched
+            batch = []
+            dropped = []
+            for entry in due:
+                following = next_fire.after(entry.cron_expression, entry.fire_at)
+                grace = grace_period(entry.misfire_grace_seconds).total_seconds()
+                on_time = following > now and now - entry.fire_at <= grace
+                if on_time or entry.misfire_policy == MISFIRE_RUN_ALL:
+                    # run_all steps through every missed fire; the loop pops them again
+                    batch.append((entry, entry.fire_at))
+                    self.queue.reschedule(entry, following)
+                    continue
+
+                run_at, skipped = catch_up(
+                    entry.cron_expression, entry.misfire_policy, entry.misfire_grace_seconds,
+                    to_datetime(entry.fire_at), to_datetime(now)
+                )
+                if run_at is not None:
+                    batch.append((entry, run_at.timestamp()))
+                if skipped is not None:
+                    dropped.append((entry, *skipped))
+                self.queue.reschedule(entry, next_fire.after(entry.cron_expression, now))
+            if dropped:
+                self.record_dropped(dropped)
+            if batch:
+                try:
+                    dispatched += self.publish(batch)
+                except Exception:
+                    # Put the batch back so the next tick fires it again;
+                    # duplicates of messages that did go out are dropped by claim_run
+                    for entry, fire_at in batch:
+                        self.queue.reschedule(entry, fire_at)
+                    raise
+
+    def publish(self, batch):
+        self.sender(batch)
+        return len(batch)
+
+    def record_dropped(self, dropped):
+        """Log each range of overdue fires that catch-up coalesced or skipped."""
+        from executions.models import ExecutionLog
+
+        now = timezone.now()
+        ExecutionLog.objects.bulk_create([
+            ExecutionLog(
+                schedule_id=entry.schedule_id,
+                celery_task_id=f'misfire-{uuid.uuid4()}',
+                status=status,
+                started_at=first,
+                completed_at=now,
+                result={'first_fire': first.isoformat(), 'last_fire': last.isoformat()},
+                error_message=f'Overdue fires {status} by the dispatcher'
+            )
+            for entry, first, last, status in dropped
+        ])
+
+    def prune(self):
+        ScheduleChange.objects.filter(created_at__lt=timezone.now() - self.change_retention).delete()
+
+    def tick(self):
+        self.poll_changes()
+        dispatched = self.dispatch_due()
+        if self.clock() - self._last_prune >= self.prune_every:
+            self._last_prune = self.clock()
+            self.prune()
+        next_fire_at = self.queue.peek()
+        wait = self.poll_interval
+        if next_fire_at is not None:
+            wait = min(wait, max(next_fire_at - self.clock(), 0.0))
+        return dispatched, wait
+
+    def run(self, stop=None, load=True):
+        loaded = not load
+        while stop is None or not stop():
+            try:
+                if not loaded:
+                    self.load()
+                    loaded = True
+                _, wait = self.tick()
+            except (DatabaseError, KombuError, OSError):
+                # Keep the heap; the next tick retries on a fresh connection
+                logger.exception('Dispatcher tick failed')
+                close_old_connections()
+                wait = self.poll_interval
+            if wait:
+                time.sleep(wait)
+
+
+class ShardedDispatcher(ScheduleDispatcher):
+    """One of N dispatcher processes, each firing the schedules of the shards it leases.
+
+    Shard leases live in the database and are renewed every few seconds.
+    Live nodes split the shards evenly, so a node that dies has its
+    leases expire and taken over within one TTL. Every fire is claimed
+    in ScheduleFire first; a node firing a tick another node already
+    claimed (during a handover) skips it.
+    """
+
+    def __init__(self, node_id=None, shard_count=None, lease_ttl=None, **kwargs):
+        super().__init__(**kwargs)
+        self.node_id = node_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        self.shard_count = shard_count or settings.SCHEDULE_DISPATCH_SHARDS
+        self.lease_ttl = lease_ttl or settings.SCHEDULE_DISPATCH_LEASE_TTL
+        self.shards = set()
+        self._last_rebalance = None
+
+    fire_retention = datetime.timedelta(days=1)
+
+    def schedules(self, shards=None):
+        shards = self.shards if shards is None else shards
+        return super().schedules().alias(shard=F('id') % self.shard_count).filter(shard__in=shards)
+
+    def load(self):
+        # Shards are loaded as they are leased, see apply_shards
+        super().load()
+        self.rebalance()
+        return len(self.queue)
+
+    def live_nodes(self, now):
+        return sorted(DispatcherNode.objects.filter(
+            heartbeat_at__gte=now - datetime.timedelta(seconds=self.lease_ttl)
+        ).values_list('node_id', flat=True))
+
+    def target_share(self, nodes):
+        count = len(nodes)
+        index = nodes.index(self.node_id)
+        return self.shard_count // count + (1 if index < self.shard_count % count else 0)
+
+    def rebalance(self):
+        now = timezone.now()
+        expires_at = now + datetime.timedelta(seconds=self.lease_ttl)
+        # Single statements only: SQLite fails a read transaction that tries to write under contention
+        if not DispatcherNode.objects.filter(node_id=self.node_id).update(heartbeat_at=now):
+            DispatcherNode.objects.bulk_create(
+                [DispatcherNode(node_id=self.node_id, heartbeat_at=now)], ignore_conflicts=True
+            )
+        DispatchShardLease.objects.bulk_create(
+            [DispatchShardLease(shard=shard) for shard in range(self.shard_count)], ignore_conflicts=True
+        )
+        leases = DispatchShardLease.objects.filter(shard__lt=self.shard_count)
+        held = set(leases.filter(owner=self.node_id, expires_at__gt=now).values_list('shard', flat=True))
+
+        target = self.target_share(self.live_nodes(now))
+        released = set(sorted(held, reverse=True)[:max(len(held) - target, 0)])
+        if released:
+            leases.filter(shard__in=released, owner=self.node_id).update(owner='', expires_at=None)
+        held -= released
+        leases.filter(shard__in=held, owner=self.node_id).update(expires_at=expires_at)
+
+        if len(held) < target:
+            free = leases.filter(Q(owner='') | Q(expires_at__isnull=True) | Q(expires_at__lte=now))
+            for shard in free.values_list('shard', flat=True)[:target - len(held)]:
+                # The conditional update is the lock: only one node wins a free shard
+                won = leases.filter(shard=shard).filter(
+                    Q(owner='') | Q(expires_at__isnull=True) | Q(expires_at__lte=now)
+                ).update(owner=self.node_id, expires_at=expires_at)
+                if won:
+                    held.add(shard)
+
+        self._last_rebalance = self.clock()
+        self.apply_shards(held)
+        return held
+
+    def apply_shards(self, shards):
+        lost = self.shards - shards
+        gained = shards - self.shards
+        self.shards = set(shards)
+        if lost:
+            for schedule_id in [pk for pk in self.queue.entries if pk % self.shard_count in lost]:
+                self.queue.remove(schedule_id)
+        if gained:
+            # Start one TTL back so ticks a dead owner missed still fire; the
+            # claims drop the ones it did fire
+            for entry in self.build_entries(self.schedules(gained), self.clock() - self.lease_ttl):
+                self.queue.push(entry)
+        if lost or gained:
+            logger.info('Dispatcher %s now owns %d shards (+%d/-%d)', self.node_id, len(shards), len(gained), len(lost))
+
+    def claim(self, fires):
+        """Claim (schedule id, fire datetime) pairs.
+
+        Returns the claim id and the schedule ids this node won.
+        """
+        claim = uuid.uuid4()
+        ScheduleFire.objects.bulk_create([
+            ScheduleFire(schedule_id=schedule_id, fire_time=fire_time, node_id=self.node_id, claim=claim)
+            for schedule_id, fire_time in fires
+        ], ignore_conflicts=True)
+        return claim, set(ScheduleFire.objects.filter(claim=claim).values_list('schedule_id', flat=True))
+
+    def publish(self, batch):
+        claim, claimed = self.claim([(entry.schedule_id, to_datetime(fire_at)) for entry, fire_at in batch])
+        won = [(entry, fire_at) for entry, fire_at in batch if entry.schedule_id in claimed]
+        if won:
+            try:
+                self.sender(won)
+            except Exception:
+                # Release the claims so the retry, or the next owner of the shard, can fire them
+                ScheduleFire.objects.filter(claim=claim).delete()
+                raise
+        return len(won)
+
+    def record_dropped(self, dropped):
+        # Claimed on the first dropped fire so a handover does not log the range twice
+        _, claimed = self.claim([(entry.schedule_id, first) for entry, first, _, _ in dropped])
+        dropped = [item for item in dropped if item[0].schedule_id in claimed]
+        if dropped:
+            super().record_dropped(dropped)
+
+    def prune(self):
+        super().prune()
+        cutoff = timezone.now() - self.fire_retention
+        ScheduleFire.objects.filter(claimed_at__lt=cutoff).delete()
+        DispatcherNode.objects.filter(heartbeat_at__lt=cutoff).delete()
+
+    def tick(self):
+        # run(load=False) reaches the first tick without a rebalance
+        if self._last_rebalance is None or self.clock() - self._last_rebalance >= self.lease_ttl / 3:
+            self.rebalance()
+        return super().tick()
+
+    def release(self):
+        DispatchShardLease.objects.filter(owner=self.node_id).update(owner='', expires_at=None)
+        DispatcherNode.objects.filter(node_id=self.node_id).delete()
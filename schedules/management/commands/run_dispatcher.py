@@ -0,0 +1,63 @@
+import signal
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from schedules.bulk import sync_beat_tasks
+from schedules.dispatcher import LoggingSender, ScheduleDispatcher, ShardedDispatcher
+
+
+class Command(BaseCommand):
+    help = 'Fire active schedules from an in-memory heap instead of celery beat'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync-beat',
+            action='store_true',
+            help='Only align the mirrored PeriodicTasks with SCHEDULE_DISPATCHER and exit'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SCHEDULE_DISPATCH_BATCH_SIZE,
+            help='Due schedules published per broker connection'
+        )
+        parser.add_argument(
+            '--node-id',
+            help='Stable name of this process in sharded mode (default: host-pid-random)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Log due schedules instead of publishing them'
+        )
+
+    def handle(self, *args, **options):
+        if options['sync_beat']:
+            enabled = sync_beat_tasks()
+            self.stdout.write(self.style.SUCCESS(f'{enabled} mirrored periodic tasks enabled for beat.'))
+            return
+
+        mode = settings.SCHEDULE_DISPATCHER
+        if mode not in ('native', 'sharded'):
+            raise CommandError('Set SCHEDULE_DISPATCHER=native or sharded so beat stops firing the same schedules')
+
+        # Schedules written while beat was in charge still have enabled mirrors
+        sync_beat_tasks()
+        sender = LoggingSender() if options['dry_run'] else None
+        if mode == 'sharded':
+            dispatcher = ShardedDispatcher(node_id=options['node_id'], sender=sender, batch_size=options['batch_size'])
+        else:
+            dispatcher = ScheduleDispatcher(sender=sender, batch_size=options['batch_size'])
+
+        # docker stop sends SIGTERM; leave through the finally block below
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            dispatcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if mode == 'sharded':
+                # Hand the shards over now rather than after the lease TTL
+                dispatcher.release()
+            self.stdout.write('Dispatcher stopped.')
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+def backfill_next_run_at(apps, schema_editor):
+    from schedules.cron import next_run_time
+    Schedule = apps.get_model('schedules', 'Schedule')
+    for schedule in Schedule.objects.filter(is_active=True).only('id', 'cron_expression'):
+        schedule.next_run_at = next_run_time(schedule.cron_expression)
+        schedule.save(update_fields=['next_run_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['next_run_at'], name='schedules_next_ru_b73f4a_idx'),
+        ),
+        migrations.RunPython(backfill_next_run_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_schedule_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DispatcherNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.CharField(max_length=100, unique=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'dispatcher_nodes',
+            },
+        ),
+        migrations.CreateModel(
+            name='DispatchShardLease',
+            fields=[
+                ('shard', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('owner', models.CharField(blank=True, default='', max_length=100)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'dispatch_shard_leases',
+                'ordering': ['shard'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleFire',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schedule_id', models.BigIntegerField()),
+                ('fire_time', models.DateTimeField()),
+                ('node_id', models.CharField(max_length=100)),
+                ('claim', models.UUIDField(db_index=True)),
+                ('claimed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'schedule_fires',
+                'indexes': [models.Index(fields=['claimed_at'], name='schedule_fi_claimed_3eb560_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='schedulefire',
+            constraint=models.UniqueConstraint(fields=('schedule_id', 'fire_time'), name='unique_schedule_fire'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_dispatch_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='misfire_grace_seconds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='misfire_policy',
+            field=models.CharField(choices=[('run_once', 'Run once'), ('run_all', 'Run all'), ('skip', 'Skip')], default='run_once', max_length=20),
+        ),
+    ]
@@ -0,0 +1,67 @@
+import datetime
+
+from django.conf import settings
+
+from .cron import compile_cron, next_run_time
+
+
+MISFIRE_RUN_ONCE = 'run_once'
+MISFIRE_RUN_ALL = 'run_all'
+MISFIRE_SKIP = 'skip'
+
+MISFIRE_POLICY_CHOICES = [
+    (MISFIRE_RUN_ONCE, 'Run once'),
+    (MISFIRE_RUN_ALL, 'Run all'),
+    (MISFIRE_SKIP, 'Skip'),
+]
+
+# ExecutionLog statuses of fires that were dropped instead of run
+DROPPED_STATUS = {
+    MISFIRE_RUN_ONCE: 'coalesced',
+    MISFIRE_SKIP: 'skipped',
+}
+
+
+def grace_period(grace_seconds):
+    if grace_seconds is None:
+        grace_seconds = settings.SCHEDULE_MISFIRE_GRACE_SECONDS
+    return datetime.timedelta(seconds=grace_seconds)
+
+
+def misfire_status(expression, policy, grace_seconds, scheduled_at, now):
+    """ExecutionLog status to record instead of running a fire due at scheduled_at, or None to run it.
+
+    Fires inside the grace window always run. Later ones are dropped under
+    ``skip``; under ``run_once`` only the newest overdue fire runs and every
+    older one is coalesced into it.
+    """
+    if policy == MISFIRE_RUN_ALL or now - scheduled_at <= grace_period(grace_seconds):
+        return None
+    if policy == MISFIRE_SKIP:
+        return DROPPED_STATUS[MISFIRE_SKIP]
+    if next_run_time(expression, scheduled_at) <= now:
+        return DROPPED_STATUS[MISFIRE_RUN_ONCE]
+    return None
+
+
+def catch_up(expression, policy, grace_seconds, fire_at, now):
+    """Plan the overdue fires of one schedule from fire_at up to now.
+
+    Returns ``(run_at, dropped)``: the one fire to publish (None if nothing
+    runs) and the ``(first, last, status)`` range of fires dropped instead.
+    ``run_all`` is left to the caller, which publishes every fire in turn.
+    """
+    latest = compile_cron(expression).previous_run(now)
+    following = next_run_time(expression, latest)
+    if following <= now:
+        latest = following
+    if latest <= fire_at:
+        latest = fire_at
+
+    run_at = latest
+    last_dropped = compile_cron(expression).previous_run(latest) if latest > fire_at else None
+    if misfire_status(expression, policy, grace_seconds, latest, now) is not None:
+        run_at, last_dropped = None, latest
+    if last_dropped is None:
+        return run_at, None
+    return run_at, (fire_at, last_dropped, DROPPED_STATUS[policy])
@@ -1,11 +1,18 @@
+import copy
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
-from croniter import croniter
 from tasks.models import TaskDefinition
+from .cron import is_valid_cron, next_run_time, next_run_times
+from .misfire import MISFIRE_POLICY_CHOICES, MISFIRE_RUN_ONCE
 
 User = get_user_model()
 
+TRACKED_FIELDS = ('cron_expression', 'is_active', 'parameters', 'task_definition_id')
+
 
 class Schedule(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='schedules')
@@ -13,6 +20,9 @@ class Schedule(models.Model):
     cron_expression = models.CharField(max_length=100)
     parameters = models.JSONField(default=dict)
     is_active = models.BooleanField(default=True)
+    misfire_policy = models.CharField(max_length=20, choices=MISFIRE_POLICY_CHOICES, default=MISFIRE_RUN_ONCE)
+    misfire_grace_seconds = models.PositiveIntegerField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -22,17 +32,54 @@ class Schedule(models.Model):
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['task_definition']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['next_run_at']),
         ]
         ordering = ['-created_at']
         
     def __str__(self):
         return f"{self.user.username} - {self.task_definition.name}"
         
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+    
+    def _remember_loaded_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: copy.deepcopy(getattr(self, name)) for name in TRACKED_FIELDS if name not in deferred
+        }
+        self._validated_checks = set()
+    
+    def mark_validated(self, *checks):
+        if not hasattr(self, '_validated_checks'):
+            self._validated_checks = set()
+        self._validated_checks.update(checks)
+    
+    def pending_checks(self):
+        loaded = getattr(self, '_loaded_values', None)
+        adding = self._state.adding or loaded is None
+        checks = set()
+        if adding or self.cron_expression != loaded.get('cron_expression'):
+            checks.add('cron_expression')
+        if adding or (self.is_active and not loaded.get('is_active')):
+            checks.add('schedule_limit')
+        if (
+            adding
+            or self.parameters != loaded.get('parameters')
+            or self.task_definition_id != loaded.get('task_definition_id')
+        ):
+            checks.add('parameters')
+        return checks - getattr(self, '_validated_checks', set())
+        
     def clean(self):
-        if not croniter.is_valid(self.cron_expression):
+        checks = self.pending_checks()
+        
+        if 'cron_expression' in checks and not is_valid_cron(self.cron_expression):
             raise ValidationError({'cron_expression': 'Invalid cron expression'})
         
-        if not self.user.is_superuser:
+        if 'schedule_limit' in checks and not self.user.is_superuser:
             active_count = Schedule.objects.filter(
                 user=self.user, 
                 is_active=True
@@ -40,20 +87,106 @@ class Schedule(models.Model):
             if active_count >= 5:
                 raise ValidationError('Regular users cannot have more than 5 active jobs')
         
-        parameter_errors = self.task_definition.validate_parameters(self.parameters)
-        if parameter_errors:
-            raise ValidationError({'parameters': parameter_errors})
+        if 'parameters' in checks:
+            parameter_errors = self.task_definition.validate_parameters(self.parameters)
+            if parameter_errors:
+                raise ValidationError({'parameters': parameter_errors})
     
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # Loaded related objects exist already; skip their FK existence queries
+        loaded_relations = [
+            name for name in ('user', 'task_definition') if self._meta.get_field(name).is_cached(self)
+        ]
+        self.full_clean(exclude=loaded_relations)
         super().save(*args, **kwargs)
+        self._remember_loaded_values()
+        
+    @property
+    def beat_enabled(self):
+        # The native dispatcher fires schedules itself; the beat mirror stays disabled
+        return self.is_active and getattr(settings, 'SCHEDULE_DISPATCHER', 'beat') == 'beat'
         
     @property
     def next_run_time(self):
-        from django.utils import timezone
-        import datetime
-        cron = croniter(self.cron_expression, timezone.now())
-        next_dt = cron.get_next(datetime.datetime)
-        if timezone.is_naive(next_dt):
-            next_dt = timezone.make_aware(next_dt, timezone.get_current_timezone())
-        return next_dt
\ No newline at end of file
+        return next_run_time(self.cron_expression)
+
+    def compute_next_run_at(self, start=None):
+        if not self.is_active:
+            return None
+        return next_run_time(self.cron_expression, start)
+
+    def advance_next_run_at(self, start=None):
+        self.next_run_at = self.compute_next_run_at(start)
+        Schedule.objects.filter(pk=self.pk).update(next_run_at=self.next_run_at)
+
+    def upcoming_run_times(self, count, start=None):
+        return next_run_times(self.cron_expression, count, start)
+
+
+class ScheduleChange(models.Model):
+    """Append-only change feed read by the native dispatcher.
+
+    The auto-increment id is the change version; rows are kept only long
+    enough for every dispatcher to catch up. Nothing is recorded under beat,
+    where no dispatcher reads or prunes the feed; a dispatcher started
+    later loads the full table anyway.
+    """
+    schedule_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'schedule_changes'
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    @classmethod
+    def record(cls, schedule_ids):
+        if getattr(settings, 'SCHEDULE_DISPATCHER', 'beat') == 'beat':
+            return
+        cls.objects.bulk_create([cls(schedule_id=schedule_id) for schedule_id in schedule_ids])
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def record_schedule_change(sender, instance, **kwargs):
+    ScheduleChange.record([instance.pk])
+
+
+class DispatcherNode(models.Model):
+    """A running sharded dispatcher; nodes missing heartbeats for a lease TTL are dead."""
+    node_id = models.CharField(max_length=100, unique=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'dispatcher_nodes'
+
+
+class DispatchShardLease(models.Model):
+    """Ownership of the schedules whose id falls in one shard (``id % shard count``)."""
+    shard = models.PositiveIntegerField(primary_key=True)
+    owner = models.CharField(max_length=100, blank=True, default='')
+    expires_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'dispatch_shard_leases'
+        ordering = ['shard']
+
+
+class ScheduleFire(models.Model):
+    """One claimed fire time; the unique key makes every tick fire at most once."""
+    schedule_id = models.BigIntegerField()
+    fire_time = models.DateTimeField()
+    node_id = models.CharField(max_length=100)
+    claim = models.UUIDField(db_index=True)
+    claimed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'schedule_fires'
+        constraints = [
+            models.UniqueConstraint(fields=['schedule_id', 'fire_time'], name='unique_schedule_fire'),
+        ]
+        indexes = [
+            models.Index(fields=['claimed_at']),
+        ]
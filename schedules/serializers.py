@@ -1,14 +1,21 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from drf_spectacular.utils import extend_schema_field
+from django.utils import timezone
+from tasks.models import TaskDefinition
+from tasks.serializers import TaskDefinitionRegistryField
 from .models import Schedule
+from .cron import next_run_time
 from .validators import validate_cron_expression, validate_user_schedule_limit, validate_task_parameters
 
 
 class ScheduleCreateSerializer(serializers.ModelSerializer):
+    task_definition = TaskDefinitionRegistryField(queryset=TaskDefinition.objects.all())
+    
     class Meta:
         model = Schedule
-        fields = ['task_definition', 'cron_expression', 'parameters', 'is_active']
+        fields = ['task_definition', 'cron_expression', 'parameters', 'is_active', 'misfire_policy', 'misfire_grace_seconds']
     
     def validate_cron_expression(self, value):
         try:
@@ -22,7 +29,9 @@ class ScheduleCreateSerializer(serializers.ModelSerializer):
         task_definition = attrs['task_definition']
         
         try:
-            validate_user_schedule_limit(user)
+            # Bulk requests check the limit once for the whole batch
+            if not self.context.get('bulk'):
+                validate_user_schedule_limit(user)
             validate_task_parameters(attrs['parameters'], task_definition)
         except DjangoValidationError as e:
             if hasattr(e, 'message_dict'):
@@ -34,7 +43,13 @@ class ScheduleCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        schedule = super().create(validated_data)
+        validated_data['next_run_at'] = Schedule(
+            cron_expression=validated_data['cron_expression'],
+            is_active=validated_data.get('is_active', True)
+        ).compute_next_run_at()
+        schedule = Schedule(**validated_data)
+        schedule.mark_validated('cron_expression', 'schedule_limit', 'parameters')
+        schedule.save()
         
         from django_celery_beat.models import PeriodicTask, CrontabSchedule
         import json
@@ -58,7 +73,8 @@ class ScheduleCreateSerializer(serializers.ModelSerializer):
                 'schedule_id': schedule.id,
                 'parameters': schedule.parameters
             }),
-            enabled=schedule.is_active
+            enabled=schedule.beat_enabled,
+            **schedule.task_definition.periodic_task_routing()
         )
         
         return schedule
@@ -67,7 +83,7 @@ class ScheduleCreateSerializer(serializers.ModelSerializer):
 class ScheduleUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Schedule
-        fields = ['cron_expression', 'parameters', 'is_active']
+        fields = ['cron_expression', 'parameters', 'is_active', 'misfire_policy', 'misfire_grace_seconds']
     
     def validate_cron_expression(self, value):
         try:
@@ -94,6 +110,10 @@ class ScheduleUpdateSerializer(serializers.ModelSerializer):
         from django_celery_beat.models import PeriodicTask, CrontabSchedule
         import json
         
+        instance.cron_expression = validated_data.get('cron_expression', instance.cron_expression)
+        instance.is_active = validated_data.get('is_active', instance.is_active)
+        validated_data['next_run_at'] = instance.compute_next_run_at()
+        instance.mark_validated('cron_expression', 'parameters')
         schedule = super().update(instance, validated_data)
         
         try:
@@ -116,7 +136,7 @@ class ScheduleUpdateSerializer(serializers.ModelSerializer):
                 'schedule_id': schedule.id,
                 'parameters': schedule.parameters
             })
-            periodic_task.enabled = schedule.is_active
+            periodic_task.enabled = schedule.beat_enabled
             periodic_task.save()
             
         except PeriodicTask.DoesNotExist:
@@ -139,10 +159,45 @@ class ScheduleSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user_id', 'user_username', 'user_full_name', 'task_definition_id',
             'task_definition_name', 'task_definition_description', 'cron_expression', 
-            'parameters', 'is_active', 'created_at', 'updated_at', 'next_run_time'
+            'parameters', 'is_active', 'misfire_policy', 'misfire_grace_seconds',
+            'created_at', 'updated_at', 'next_run_time', 'next_run_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'next_run_at']
     
     @extend_schema_field(serializers.DateTimeField(allow_null=True))
     def get_next_run_time(self, obj):
-        return obj.next_run_time
\ No newline at end of file
+        # Rows sharing a cron expression share a fire time within one response
+        if not hasattr(self, '_next_run_times'):
+            self._next_run_times = {}
+            self._now = timezone.now()
+        if obj.cron_expression not in self._next_run_times:
+            self._next_run_times[obj.cron_expression] = next_run_time(obj.cron_expression, self._now)
+        return self._next_run_times[obj.cron_expression]
+
+
+
+class ScheduleBulkCreateSerializer(serializers.Serializer):
+    schedules = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.SCHEDULE_BULK_MAX_ITEMS
+    )
+
+
+class ScheduleBulkUpdateSerializer(serializers.Serializer):
+    schedules = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.SCHEDULE_BULK_MAX_ITEMS,
+        help_text='Each item carries the schedule id plus the fields to change'
+    )
+
+
+class ScheduleBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=settings.SCHEDULE_BULK_MAX_ITEMS
+    )
+
+
+class ScheduleBulkResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    id = serializers.IntegerField(allow_null=True)
+    status = serializers.ChoiceField(choices=['created', 'updated', 'deleted', 'error'])
+    schedule = ScheduleSerializer(required=False)
+    errors = serializers.DictField(required=False)
@@ -0,0 +1,147 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tasks.models import TaskDefinition
+from tasks.registry import task_registry
+from users.models import User
+from .models import Schedule, ScheduleChange
+
+
+LIMIT_QUERY = 'SELECT COUNT(*)'
+
+
+@override_settings(SCHEDULE_DISPATCHER='beat')
+class ScheduleWriteQueryCountTests(TestCase):
+    """Pins the SQL issued per schedule write so validation stays one query per check.
+
+    The counts include the beat mirror (PeriodicTask and CrontabSchedule
+    rows); the schedule_changes feed is not written under beat. The
+    active-schedule limit query must appear only when a write creates or
+    re-activates a schedule.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pw', first_name='O', last_name='W'
+        )
+        cls.task_definition = TaskDefinition.objects.create(
+            name='Send Email',
+            description='Send an email',
+            celery_task_name='tasks.celery_tasks.send_email_task',
+            input_schema={'email': 'string', 'delay': {'type': 'integer', 'min': 0, 'max': 3600}},
+        )
+
+    def setUp(self):
+        # Warm the process-local registry so counts do not depend on test order
+        task_registry.invalidate()
+        task_registry.active()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_schedule(self, **overrides):
+        fields = {
+            'user': self.user,
+            'task_definition': self.task_definition,
+            'cron_expression': '0 * * * *',
+            'parameters': {'email': 'someone@example.com'},
+        }
+        fields.update(overrides)
+        return Schedule.objects.create(**fields)
+
+    def create_through_api(self):
+        response = self.client.post('/api/schedules/', {
+            'task_definition': self.task_definition.id,
+            'cron_expression': '0 * * * *',
+            'parameters': {'email': 'someone@example.com'},
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def assertLimitChecks(self, context, expected):
+        checks = [query for query in context.captured_queries if query['sql'].startswith(LIMIT_QUERY)]
+        self.assertEqual(len(checks), expected, [query['sql'] for query in checks])
+
+    # ORM
+
+    def test_orm_create(self):
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(2):
+            self.create_schedule()
+        self.assertLimitChecks(context, 1)
+
+    def test_orm_update(self):
+        schedule = self.create_schedule()
+        schedule.cron_expression = '5 * * * *'
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(1):
+            schedule.save()
+        self.assertLimitChecks(context, 0)
+
+    def test_orm_deactivate(self):
+        schedule = self.create_schedule()
+        schedule.is_active = False
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(1):
+            schedule.save()
+        self.assertLimitChecks(context, 0)
+
+    def test_orm_reactivate(self):
+        schedule = self.create_schedule(is_active=False)
+        schedule.is_active = True
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(2):
+            schedule.save()
+        self.assertLimitChecks(context, 1)
+
+    def test_orm_delete(self):
+        schedule = self.create_schedule()
+        with self.assertNumQueries(4):
+            schedule.delete()
+
+    # API
+
+    def test_api_create(self):
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(20):
+            self.create_through_api()
+        self.assertLimitChecks(context, 1)
+
+    def test_api_update(self):
+        schedule_id = self.create_through_api()
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(21):
+            response = self.client.patch(
+                f'/api/schedules/{schedule_id}/', {'cron_expression': '5 * * * *'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertLimitChecks(context, 0)
+
+    def test_api_toggle_active(self):
+        schedule_id = self.create_through_api()
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(14):
+            response = self.client.post(f'/api/schedules/{schedule_id}/toggle_active/')
+        self.assertFalse(response.data['is_active'])
+        self.assertLimitChecks(context, 0)
+
+        with CaptureQueriesContext(connection) as context, self.assertNumQueries(15):
+            response = self.client.post(f'/api/schedules/{schedule_id}/toggle_active/')
+        self.assertTrue(response.data['is_active'])
+        self.assertLimitChecks(context, 1)
+
+    def test_api_delete(self):
+        schedule_id = self.create_through_api()
+        with self.assertNumQueries(11):
+            response = self.client.delete(f'/api/schedules/{schedule_id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Schedule.objects.filter(pk=schedule_id).exists())
+
+    # Change feed
+
+    def test_change_feed_skipped_under_beat(self):
+        schedule = self.create_schedule()
+        schedule.delete()
+        self.assertFalse(ScheduleChange.objects.exists())
+
+    @override_settings(SCHEDULE_DISPATCHER='native')
+    def test_change_feed_recorded_for_dispatcher(self):
+        schedule = self.create_schedule()
+        schedule_id = schedule.id
+        schedule.delete()
+        self.assertEqual(list(ScheduleChange.objects.values_list('schedule_id', flat=True)), [schedule_id, schedule_id])
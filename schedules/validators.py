@@ -13,8 +13,8 @@ def validate_user_schedule_limit(user, exclude_pk=None):
 
 
 def validate_cron_expression(value):
-    from croniter import croniter
-    if not croniter.is_valid(value):
+    from .cron import is_valid_cron
+    if not is_valid_cron(value):
         raise ValidationError("Invalid cron expression format")
 
 
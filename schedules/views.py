@@ -6,11 +6,18 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from drf_spectacular.utils import extend_schema
 from django_celery_beat.models import PeriodicTask
 from .models import Schedule
-from .serializers import ScheduleSerializer, ScheduleCreateSerializer, ScheduleUpdateSerializer
+from .serializers import (
+    ScheduleSerializer, ScheduleCreateSerializer, ScheduleUpdateSerializer,
+    ScheduleBulkCreateSerializer, ScheduleBulkUpdateSerializer, ScheduleBulkDeleteSerializer,
+    ScheduleBulkResultSerializer
+)
+from . import bulk
 from executions.models import ExecutionLog
-from executions.serializers import ExecutionLogSerializer
+from executions.serializers import ExecutionLogSerializer, ExecutionStatsQuerySerializer, ExecutionStatsSerializer
+from executions.stats import execution_stats, filter_window
 from api.permissions import IsOwnerOrSuperUser
 from api.filters import ScheduleFilter
+from api.pagination import KeysetPagination, ScheduleKeysetPagination, ExecutionLogKeysetPagination
 
 
 class ScheduleViewSet(viewsets.ModelViewSet):
@@ -19,7 +26,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrSuperUser]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_class = ScheduleFilter
-    ordering_fields = ['created_at', 'updated_at', 'is_active']
+    ordering_fields = ['created_at', 'updated_at', 'is_active', 'next_run_at']
     search_fields = ['task_definition__name']
     ordering = ['-created_at']
     
@@ -29,6 +36,15 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             return Schedule.objects.select_related('user', 'task_definition').all()
         return Schedule.objects.select_related('user', 'task_definition').filter(user=user)
     
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and KeysetPagination.is_requested(self.request):
+            if self.action == 'logs':
+                self._paginator = ExecutionLogKeysetPagination()
+            else:
+                self._paginator = ScheduleKeysetPagination()
+        return super().paginator
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return ScheduleCreateSerializer
@@ -72,6 +88,24 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         serializer = ExecutionLogSerializer(executions, many=True)
         return Response(serializer.data)
     
+    @extend_schema(
+        parameters=[ExecutionStatsQuerySerializer],
+        responses={200: ExecutionStatsSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        schedule = self.get_object()
+        params = ExecutionStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        executions = filter_window(
+            ExecutionLog.objects.filter(schedule=schedule),
+            params.validated_data.get('since'),
+            params.validated_data.get('until')
+        )
+        results = execution_stats(executions, bucket=params.validated_data.get('bucket'))
+        return Response(ExecutionStatsSerializer(results, many=True).data)
+    
     @extend_schema(
         request=None,
         responses={200: {'type': 'object', 'properties': {'message': {'type': 'string'}}}}
@@ -80,11 +114,12 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     def toggle_active(self, request, pk=None):
         schedule = self.get_object()
         schedule.is_active = not schedule.is_active
+        schedule.next_run_at = schedule.compute_next_run_at()
         schedule.save()
         
         try:
             periodic_task = PeriodicTask.objects.get(name=f"schedule_{schedule.id}")
-            periodic_task.enabled = schedule.is_active
+            periodic_task.enabled = schedule.beat_enabled
             periodic_task.save()
         except PeriodicTask.DoesNotExist:
             pass
@@ -119,10 +154,43 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    @extend_schema(
+        request=ScheduleBulkCreateSerializer,
+        responses={201: ScheduleBulkResultSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        payload = ScheduleBulkCreateSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        results = bulk.create_many(
+            payload.validated_data['schedules'], request.user, self.get_serializer_context()
+        )
+        return Response(results, status=bulk.bulk_response_status(results, status.HTTP_201_CREATED))
+    
+    @extend_schema(
+        request=ScheduleBulkUpdateSerializer,
+        responses={200: ScheduleBulkResultSerializer(many=True)}
+    )
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        payload = ScheduleBulkUpdateSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        results = bulk.update_many(
+            payload.validated_data['schedules'], self.get_queryset(), self.get_serializer_context()
+        )
+        return Response(results, status=bulk.bulk_response_status(results, status.HTTP_200_OK))
+    
+    @extend_schema(
+        request=ScheduleBulkDeleteSerializer,
+        responses={200: ScheduleBulkResultSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        payload = ScheduleBulkDeleteSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        results = bulk.delete_many(payload.validated_data['ids'], self.get_queryset())
+        return Response(results, status=bulk.bulk_response_status(results, status.HTTP_200_OK))
+    
     def perform_destroy(self, instance):
-        try:
-            periodic_task = PeriodicTask.objects.get(name=f"schedule_{instance.id}")
-            periodic_task.delete()
-        except PeriodicTask.DoesNotExist:
-            pass
+        PeriodicTask.objects.filter(name=f"schedule_{instance.id}").delete()
         instance.delete()
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Throughput of file_backup_task's copier pipeline across thread counts.
+
+Builds a synthetic tree of many small files plus a few huge ones, then
+backs it up into a fresh destination with parallelism 1, 2, 4, ... (up to
+--max-parallelism) and reports wall time, files/s and MB/s. Each run is
+followed by an incremental re-run, which should copy nothing. The source
+is read back from the page cache after the first run; point --directory at
+the filesystem you care about and drop caches between runs to measure cold
+reads.
+
+    python scripts/bench_backup.py --small-files 100000 --huge-files 2 --huge-size 1024
+    python scripts/bench_backup.py --format chunked --compress --max-parallelism 16
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "insighthub.settings")
+
+
+def build_tree(source, small_files, small_size, huge_files, huge_size_mb, seed):
+    rng = random.Random(seed)
+    total = 0
+    for index in range(small_files):
+        directory = os.path.join(source, f"d{index % 256:03d}", f"e{index // 256 % 64:02d}")
+        os.makedirs(directory, exist_ok=True)
+        size = rng.randint(small_size // 2, small_size * 2)
+        # Half random (incompressible), half repetitive text
+        payload = rng.randbytes(size // 2) + (f"row {index}\n" * size)[:size - size // 2].encode()
+        with open(os.path.join(directory, f"f{index}.dat"), "wb") as handle:
+            handle.write(payload)
+        total += size
+    block = rng.randbytes(1024 * 1024)
+    for index in range(huge_files):
+        with open(os.path.join(source, f"huge{index}.bin"), "wb") as handle:
+            for step in range(huge_size_mb):
+                handle.write(block[step % 1024:] + block[:step % 1024])
+        total += huge_size_mb * 1024 * 1024
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small-files", type=int, default=20000)
+    parser.add_argument("--small-size", type=int, default=4096, help="typical small file size in bytes")
+    parser.add_argument("--huge-files", type=int, default=2)
+    parser.add_argument("--huge-size", type=int, default=256, help="size of each huge file in MB")
+    parser.add_argument("--max-parallelism", type=int, default=16)
+    parser.add_argument("--format", choices=["mirror", "chunked"], default="mirror")
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--directory", help="where to build the tree (default: a temporary directory)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        source = os.path.join(directory, "source")
+        destinations = os.path.join(directory, "backups")
+        os.makedirs(destinations)
+        os.environ["BACKUP_SOURCE_ROOT"] = source
+        os.environ["BACKUP_DESTINATION_ROOT"] = destinations
+        os.environ["BACKUP_MAX_PARALLELISM"] = str(args.max_parallelism)
+
+        import django
+
+        django.setup()
+        from tasks.backups import create_backup_engine
+
+        began = time.perf_counter()
+        total = build_tree(source, args.small_files, args.small_size, args.huge_files, args.huge_size, args.seed)
+        print(f"Built {args.small_files} small + {args.huge_files} huge files ({total / 1e6:.0f} MB) "
+              f"in {time.perf_counter() - began:.1f} s; {os.cpu_count()} CPUs, format={args.format}, "
+              f"compress={args.compress}")
+
+        counts = [1]
+        while counts[-1] * 2 <= args.max_parallelism:
+            counts.append(counts[-1] * 2)
+
+        baseline = None
+        for parallelism in counts:
+            destination = os.path.join(destinations, f"p{parallelism}")
+            parameters = {
+                "source_path": source, "destination": destination, "format": args.format,
+                "compress": args.compress, "parallelism": parallelism,
+            }
+            began = time.perf_counter()
+            result = create_backup_engine(parameters).run()
+            elapsed = time.perf_counter() - began
+            began = time.perf_counter()
+            again = create_backup_engine(parameters).run()
+            incremental = time.perf_counter() - began
+            baseline = baseline or elapsed
+            print(f"  parallelism={parallelism:<3} full {elapsed:7.2f} s  speedup {baseline / elapsed:5.2f}x  "
+                  f"{result['files_copied'] / elapsed:8.0f} files/s  {result['bytes_copied'] / 1e6 / elapsed:7.1f} MB/s  "
+                  f"written {result['bytes_written'] / 1e6:6.0f} MB  |  incremental {incremental:6.2f} s, "
+                  f"{again['files_copied']} copied")
+            shutil.rmtree(destination)
+
+
+if __name__ == "__main__":
+    main()
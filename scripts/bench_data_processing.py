@@ -0,0 +1,92 @@
+"""Scaling of data_processing_task's parallel mode across worker processes.
+
+Writes a temporary dataset, then runs the same complex summary with 1, 2, 4,
+... workers (up to --max-workers) and reports wall time, speedup and
+whether every run produced the same statistics as the single-process run.
+
+    python scripts/bench_data_processing.py --records 20000000 --format f64
+    python scripts/bench_data_processing.py --records 2000000 --format csv --max-workers 8
+"""
+import argparse
+import array
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "insighthub.settings")
+
+
+def write_dataset(directory, fmt, records, seed):
+    rng = random.Random(seed)
+    path = os.path.join(directory, f"bench.{fmt}")
+    block = 100000
+    with open(path, "wb" if fmt == "f64" else "w") as handle:
+        if fmt == "csv":
+            handle.write("id,value\n")
+        for offset in range(0, records, block):
+            values = [rng.gauss(50.0, 15.0) for _ in range(min(block, records - offset))]
+            if fmt == "f64":
+                array.array("d", values).tofile(handle)
+            elif fmt == "csv":
+                handle.writelines(f"{offset + index},{value!r}\n" for index, value in enumerate(values))
+            else:
+                handle.writelines(f'{{"value": {value!r}}}\n' for value in values)
+    return os.path.basename(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=5000000)
+    parser.add_argument("--format", choices=["f64", "csv", "jsonl"], default="f64")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATA_PROCESSING_ROOT"] = directory
+        os.environ["DATA_PROCESSING_MAX_WORKERS"] = str(args.max_workers)
+
+        import django
+
+        django.setup()
+        from tasks.accumulators import np
+        from tasks.datasets import process_dataset
+
+        began = time.perf_counter()
+        source_path = write_dataset(directory, args.format, args.records, args.seed)
+        size = os.path.getsize(os.path.join(directory, source_path))
+        print(f"Wrote {args.records} records ({size / 1e6:.0f} MB {args.format}) in {time.perf_counter() - began:.1f} s; "
+              f"{os.cpu_count()} CPUs, NumPy {'on' if np is not None else 'off'}")
+
+        counts = [1]
+        while counts[-1] * 2 <= args.max_workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != args.max_workers:
+            counts.append(args.max_workers)
+
+        baseline = reference = None
+        for workers in counts:
+            parameters = {
+                "source_path": source_path, "column": "value", "processing_type": "complex",
+                "workers": workers, "chunk_size": args.chunk_size,
+            }
+            began = time.perf_counter()
+            result = process_dataset(parameters)
+            elapsed = time.perf_counter() - began
+            statistics = result["statistics"]
+            if baseline is None:
+                baseline, reference = elapsed, statistics
+            same = all(abs(statistics[key] - reference[key]) <= 1e-9 * max(1.0, abs(reference[key]))
+                       for key in reference)
+            print(f"  workers={workers:<3} parts={result.get('parts', 1):<4} {elapsed:7.2f} s  "
+                  f"speedup {baseline / elapsed:5.2f}x  {result['processed_records'] / elapsed / 1e6:6.2f} M records/s  "
+                  f"{'same statistics' if same else 'STATISTICS DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Dispatch latency of the native scheduler with a large in-memory schedule set.
+
+Runs without a database or broker: schedules are synthesized, the clock is
+simulated minute by minute and the sender only counts messages.
+
+    python scripts/bench_dispatcher.py --schedules 100000 --minutes 60
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "insighthub.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from schedules.dispatcher import DispatchEntry, NextFireCache, ScheduleDispatcher  # noqa: E402
+
+
+def cron_pool(size, rng):
+    pool = ["* * * * *", "*/5 * * * *", "*/15 * * * *", "0 * * * *", "0 0 * * *"]
+    while len(pool) < size:
+        pool.append(f"{rng.randrange(60)} {rng.choice(['*', '*/2', '*/6', str(rng.randrange(24))])} * * *")
+    return pool
+
+
+class CountingSender:
+    def __init__(self):
+        self.messages = 0
+        self.batches = 0
+
+    def __call__(self, batch):
+        self.batches += 1
+        self.messages += len(batch)
+
+
+def ms(seconds):
+    return f"{seconds * 1000:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schedules", type=int, default=100000)
+    parser.add_argument("--expressions", type=int, default=500)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = cron_pool(args.expressions, rng)
+    start = (time.time() // 60) * 60 + 1
+    clock = [start]
+    sender = CountingSender()
+    dispatcher = ScheduleDispatcher(
+        sender=sender, batch_size=args.batch_size, poll_interval=1.0, clock=lambda: clock[0]
+    )
+
+    began = time.perf_counter()
+    next_fire = NextFireCache()
+    entries = []
+    for schedule_id in range(1, args.schedules + 1):
+        entry = DispatchEntry(schedule_id, rng.choice(pool), "tasks.celery_tasks.send_email_task", {"delay": 0})
+        entry.fire_at = next_fire.after(entry.cron_expression, start)
+        entries.append(entry)
+    dispatcher.queue.load(entries)
+    print(f"Loaded {len(dispatcher.queue)} schedules ({len(pool)} expressions) in {ms(time.perf_counter() - began)}")
+
+    edits = rng.sample(entries, min(args.edits, len(entries)))
+    began = time.perf_counter()
+    for entry in edits:
+        edited = DispatchEntry(entry.schedule_id, rng.choice(pool), entry.task_name, entry.parameters)
+        edited.fire_at = next_fire.after(edited.cron_expression, start)
+        dispatcher.queue.push(edited)
+    elapsed = time.perf_counter() - began
+    print(f"Applied {len(edits)} single-schedule edits in {ms(elapsed)} ({elapsed / len(edits) * 1e6:.1f} us each)")
+
+    ticks = []
+    for minute in range(1, args.minutes + 1):
+        clock[0] = start + minute * 60
+        before = sender.messages
+        began = time.perf_counter()
+        dispatcher.dispatch_due()
+        ticks.append((time.perf_counter() - began, sender.messages - before))
+
+    durations = sorted(duration for duration, _ in ticks)
+    busiest = max(ticks)
+    print(f"Dispatched {sender.messages} runs in {sender.batches} batches over {args.minutes} simulated minutes")
+    print(f"Tick latency: p50 {ms(statistics.median(durations))}, "
+          f"p95 {ms(durations[int(len(durations) * 0.95) - 1])}, max {ms(busiest[0])} ({busiest[1]} due)")
+    print(f"Per run at the busiest tick: {busiest[0] / max(busiest[1], 1) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare per-message SMTP connections with the pooled and batched mail transport.
+
+Starts scripts/smtp_sink.py in-process, so no relay is needed. --connect-delay
+stands in for the TLS and auth handshake a real relay makes every new
+connection pay.
+
+    python scripts/bench_mail.py --emails 500 --threads 16 --connect-delay 0.02
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "insighthub.settings")
+
+from smtp_sink import SMTPSink  # noqa: E402
+
+
+def message(index):
+    from django.core.mail import EmailMessage
+
+    return EmailMessage(
+        subject=f"Benchmark {index}", body="Scheduled email body.",
+        from_email="noreply@insighthub.com", to=[f"user{index}@example.com"],
+    )
+
+
+def per_message(emails, threads):
+    from django.core.mail import send_mail
+
+    # What send_email_task did before: one connection, login and QUIT per email
+    def send(index):
+        send_mail(f"Benchmark {index}", "Scheduled email body.", "noreply@insighthub.com",
+                  [f"user{index}@example.com"])
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(send, range(emails)))
+
+
+def batched(window):
+    def run(emails, threads):
+        from tasks.mail import MailBatcher
+
+        # A full batch is sent without waiting out the window
+        batcher = MailBatcher(max_size=threads, window=window)
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda index: batcher.send(message(index)), range(emails)))
+        batcher.close()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=16, help="concurrent sends, like a threads/gevent pool")
+    parser.add_argument("--connect-delay", type=float, default=0.02)
+    parser.add_argument("--window", type=float, default=0.01, help="batch window for the batched run")
+    args = parser.parse_args()
+
+    sink = SMTPSink(connect_delay=args.connect_delay).start()
+    os.environ["EMAIL_HOST"] = "127.0.0.1"
+    os.environ["EMAIL_PORT"] = str(sink.port)
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+
+    runs = [
+        ("per-message connection", "django.core.mail.backends.smtp.EmailBackend", per_message),
+        ("pooled", "tasks.mail.PooledEmailBackend", batched(0)),
+        (f"pooled + {args.window}s batches", "tasks.mail.PooledEmailBackend", batched(args.window)),
+    ]
+    print(f"{args.emails} emails, {args.threads} threads, {args.connect_delay * 1000:.0f} ms handshake")
+    for label, backend, run in runs:
+        settings.EMAIL_BACKEND = backend
+        connections, messages = sink.stats.connections, sink.stats.messages
+        began = time.perf_counter()
+        run(args.emails, args.threads)
+        elapsed = time.perf_counter() - began
+        print(f"  {label:<28} {elapsed:6.2f} s  {args.emails / elapsed:7.0f} emails/s  "
+              f"{sink.stats.connections - connections:4d} connections  "
+              f"{sink.stats.messages - messages} delivered")
+
+    sink.shutdown()
+
+
+if __name__ == "__main__":
+    main()
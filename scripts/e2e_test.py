@@ -31,6 +31,9 @@ def http_get(path, token=None):
 def choose_params(input_schema):
     params = {}
     for key, typ in (input_schema or {}).items():
+        spec = typ if isinstance(typ, dict) else {}
+        if isinstance(typ, dict):
+            typ = typ.get("type")
         if typ == "string":
             if "email" in key:
                 params[key] = "test@example.com"
@@ -39,11 +42,18 @@ def choose_params(input_schema):
             elif "destination" in key:
                 params[key] = "/backup"
             elif "table" in key:
-                params[key] = "logs"
+                params[key] = "execution_logs"
+            elif key == "timestamp_column":
+                params[key] = "started_at"
+            elif key == "report_type":
+                params[key] = "basic"
+            elif key == "format":
+                # Each task has its own default format
+                continue
             else:
                 params[key] = "sample"
         elif typ == "integer":
-            params[key] = 1
+            params[key] = max(1, spec.get("min") or 1)
         elif typ == "boolean":
             params[key] = True
         elif typ == "float":
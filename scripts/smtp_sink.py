@@ -0,0 +1,96 @@
+"""Local SMTP server that accepts and discards every message, for mail benchmarks.
+
+Speaks just enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP,
+QUIT) and counts connections and messages. --connect-delay adds a pause
+before the greeting to stand in for a relay's TLS and auth handshake.
+
+    python scripts/smtp_sink.py --port 2525 --connect-delay 0.05
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class SinkStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+    def add(self, connections=0, messages=0):
+        with self.lock:
+            self.connections += connections
+            self.messages += messages
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self):
+        self.server.stats.add(connections=1)
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+        self.reply("220 smtp-sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-smtp-sink")
+                self.reply("250 8BITMIME")
+            elif command in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                self.server.stats.add(messages=1)
+                self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, connect_delay=0.0):
+        super().__init__((host, port), SMTPHandler)
+        self.connect_delay = connect_delay
+        self.stats = SinkStats()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds before the greeting")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.connect_delay)
+    print(f"SMTP sink listening on {args.host}:{sink.port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{sink.stats.connections} connections, {sink.stats.messages} messages")
+
+
+if __name__ == "__main__":
+    main()
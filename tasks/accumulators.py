@@ -0,0 +1,183 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    # Installed from requirements.txt; without it chunks are plain float sequences
+    # and the pure-Python paths below are used
+    np = None
+
+
+class RunningStats:
+    """One-pass count, mean, variance, min and max (Welford/Chan).
+
+    Each chunk is reduced to its own count, mean and sum of squared
+    deviations and merged in. This is numerically stable and lets partial
+    results from separate chunks or processes be combined exactly.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        count = len(values)
+        if not count:
+            return
+        if np is not None and isinstance(values, np.ndarray):
+            mean = float(values.mean())
+            m2 = float(np.square(values - mean).sum())
+            minimum, maximum = float(values.min()), float(values.max())
+        else:
+            mean = math.fsum(values) / count
+            m2 = math.fsum((value - mean) ** 2 for value in values)
+            minimum, maximum = min(values), max(values)
+        self._combine(count, mean, m2, minimum, maximum)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+        return self
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self):
+        return math.sqrt(self.variance)
+
+    def state(self):
+        return [self.count, self.mean, self.m2, self.minimum, self.maximum]
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        stats.count, stats.mean, stats.m2, stats.minimum, stats.maximum = state
+        return stats
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error ``accuracy`` (DDSketch).
+
+    Values fall into logarithmic buckets, with one set of buckets for positive
+    values and one for negative values. Any quantile is then within
+    ``accuracy`` of the true value, relative to its size. Memory is capped at
+    ``max_buckets`` buckets per sign. When that fills up, the buckets closest
+    to zero are folded together, which only affects the smallest magnitudes.
+    """
+
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def update(self, values):
+        if not len(values):
+            return
+        if np is not None and isinstance(values, np.ndarray):
+            self._update_array(values)
+        else:
+            for value in values:
+                if value > 0:
+                    self._add(self.positive, self._key(value), 1)
+                elif value < 0:
+                    self._add(self.negative, self._key(-value), 1)
+                else:
+                    self.zeros += 1
+        self.count += len(values)
+        self._collapse(self.positive)
+        self._collapse(self.negative)
+
+    def _update_array(self, values):
+        for store, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(magnitudes):
+                keys, counts = np.unique(
+                    np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64), return_counts=True
+                )
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    self._add(store, key, count)
+        self.zeros += int(np.count_nonzero(values == 0))
+
+    def _key(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    @staticmethod
+    def _add(store, key, count):
+        store[key] = store.get(key, 0) + count
+
+    def _collapse(self, store):
+        if len(store) <= self.max_buckets:
+            return
+        keys = sorted(store)
+        overflow = keys[:len(keys) - self.max_buckets + 1]
+        floor = overflow[-1]
+        store[floor] = sum(store.pop(key) for key in overflow[:-1]) + store[floor]
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                self._add(store, key, count)
+            self._collapse(store)
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def state(self):
+        return {
+            'accuracy': self.accuracy,
+            'max_buckets': self.max_buckets,
+            'positive': list(self.positive.items()),
+            'negative': list(self.negative.items()),
+            'zeros': self.zeros,
+            'count': self.count,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state['accuracy'], state['max_buckets'])
+        sketch.positive = {int(key): count for key, count in state['positive']}
+        sketch.negative = {int(key): count for key, count in state['negative']}
+        sketch.zeros = state['zeros']
+        sketch.count = state['count']
+        return sketch
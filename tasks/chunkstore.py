@@ -0,0 +1,221 @@
+import datetime
+import hashlib
+import json
+import os
+import random
+import secrets
+import tempfile
+import zlib
+
+
+MIN_CHUNK_SIZE = 16 * 1024
+AVERAGE_CHUNK_SIZE = 48 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+READ_SIZE = 4 * 1024 * 1024
+
+RAW_MARKER = b'\x00'
+ZLIB_MARKER = b'\x01'
+
+# Each byte value falls in the "cut" class with probability one half, and a
+# chunk ends after CUT_RUN cut-class bytes in a row, which on varied data
+# happens about 2 ** (CUT_RUN + 1) bytes past MIN_CHUNK_SIZE. Both steps run
+# in C via bytes.translate and bytes.find, so chunking keeps up with disk
+# reads, which a per-byte rolling hash in Python cannot. The seed is fixed:
+# changing it moves every boundary and stops old chunks from deduplicating.
+_cut_random = random.Random(0x1C0FFEE)
+_cut_bytes = frozenset(_cut_random.sample(range(256), 128))
+CUT_CLASSES = bytes(0 if value in _cut_bytes else 1 for value in range(256))
+CUT_RUN = (AVERAGE_CHUNK_SIZE - MIN_CHUNK_SIZE).bit_length() - 2
+CUT_PATTERN = bytes(CUT_RUN)
+
+
+class ChunkStoreError(ValueError):
+    pass
+
+
+def cut_point(classes, start, end):
+    """Offset where the chunk starting at ``start`` ends, given the translated buffer."""
+    if end - start <= MIN_CHUNK_SIZE:
+        return end
+    limit = min(start + MAX_CHUNK_SIZE, end)
+    # The run may begin before MIN_CHUNK_SIZE as long as it ends after it
+    found = classes.find(CUT_PATTERN, start + MIN_CHUNK_SIZE - CUT_RUN, limit)
+    return found + CUT_RUN if found != -1 else limit
+
+
+def content_chunks(stream):
+    """Split a binary stream into content-defined chunks, holding at most READ_SIZE + MAX_CHUNK_SIZE bytes.
+
+    Boundaries depend only on the last CUT_RUN bytes, so an insert or edit
+    early in a file changes the chunks around it and leaves the rest
+    identical.
+    """
+    buffer = classes = b''
+    eof = False
+    while True:
+        if not eof and len(buffer) < MAX_CHUNK_SIZE:
+            block = stream.read(READ_SIZE)
+            eof = not block
+            buffer += block
+            classes += block.translate(CUT_CLASSES)
+        if not buffer:
+            return
+        start = 0
+        # Only cut where a full MAX_CHUNK_SIZE window is available, unless the stream is done
+        while len(buffer) - start >= MAX_CHUNK_SIZE or (eof and start < len(buffer)):
+            end = cut_point(classes, start, len(buffer))
+            yield buffer[start:end]
+            start = end
+        buffer, classes = buffer[start:], classes[start:]
+        if eof and not buffer:
+            return
+
+
+class ChunkStore:
+    """Content-addressed chunk directory: ``chunks/<2 hex>/<sha256>``.
+
+    Each chunk file is one marker byte followed by the chunk, either raw or
+    zlib-compressed. The id is always the SHA-256 of the uncompressed bytes,
+    so compressed and raw runs share chunks.
+    """
+
+    def __init__(self, root, compress=False, compression_level=6):
+        self.root = os.path.join(root, 'chunks')
+        self.compress = compress
+        self.compression_level = compression_level
+
+    def path(self, chunk_id):
+        return os.path.join(self.root, chunk_id[:2], chunk_id)
+
+    def has(self, chunk_id):
+        return os.path.exists(self.path(chunk_id))
+
+    def put(self, data):
+        """Store ``data`` unless it is already present; returns ``(chunk_id, bytes_written)``."""
+        chunk_id = hashlib.sha256(data).hexdigest()
+        path = self.path(chunk_id)
+        if os.path.exists(path):
+            return chunk_id, 0
+        payload = RAW_MARKER + data
+        if self.compress:
+            compressed = zlib.compress(data, self.compression_level)
+            if len(compressed) < len(data):
+                payload = ZLIB_MARKER + compressed
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.partial-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(payload)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        return chunk_id, len(payload)
+
+    def get(self, chunk_id, verify=True):
+        try:
+            with open(self.path(chunk_id), 'rb') as handle:
+                payload = handle.read()
+        except FileNotFoundError:
+            raise ChunkStoreError(f'chunk {chunk_id} is missing') from None
+        marker, body = payload[:1], payload[1:]
+        if marker == ZLIB_MARKER:
+            try:
+                data = zlib.decompress(body)
+            except zlib.error:
+                raise ChunkStoreError(f'chunk {chunk_id} is corrupt') from None
+        elif marker == RAW_MARKER:
+            data = body
+        else:
+            raise ChunkStoreError(f'chunk {chunk_id} is corrupt')
+        if verify and hashlib.sha256(data).hexdigest() != chunk_id:
+            raise ChunkStoreError(f'chunk {chunk_id} is corrupt')
+        return data
+
+
+class SnapshotStore:
+    """Per-run manifests in ``snapshots/<id>.json``; ids sort in creation order."""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 'snapshots')
+
+    def ids(self):
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith('.json') and not name.startswith('.'))
+
+    def latest_id(self):
+        ids = self.ids()
+        return ids[-1] if ids else None
+
+    def load(self, snapshot_id=None):
+        snapshot_id = snapshot_id or self.latest_id()
+        if snapshot_id is None:
+            raise ChunkStoreError('no snapshots found')
+        try:
+            with open(os.path.join(self.root, f'{snapshot_id}.json')) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            raise ChunkStoreError(f'snapshot {snapshot_id} not found') from None
+
+    def save(self, source, files):
+        os.makedirs(self.root, exist_ok=True)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        snapshot_id = f"{now:%Y%m%dT%H%M%S%fZ}-{secrets.token_hex(3)}"
+        fd, temporary = tempfile.mkstemp(dir=self.root, prefix='.partial-')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(
+                {'id': snapshot_id, 'created_at': now.isoformat(), 'source': source, 'files': files},
+                handle, separators=(',', ':')
+            )
+        os.replace(temporary, os.path.join(self.root, f'{snapshot_id}.json'))
+        return snapshot_id
+
+
+def restore_file(chunks, entry, target):
+    """Stream a snapshot entry's chunks back into ``target`` and restore its mode and mtime."""
+    directory = os.path.dirname(target) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix='.partial-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            for chunk_id in entry['chunks']:
+                handle.write(chunks.get(chunk_id))
+        os.chmod(temporary, entry['mode'])
+        os.utime(temporary, ns=(entry['mtime_ns'], entry['mtime_ns']))
+        os.replace(temporary, target)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def verify_snapshots(root, snapshot_ids, full=False):
+    """Check that every chunk the snapshots reference exists (and, with ``full``, re-hash it).
+
+    Returns ``(chunks_checked, problems)`` where problems is a list of messages.
+    """
+    chunks = ChunkStore(root)
+    snapshots = SnapshotStore(root)
+    referenced = {}
+    problems = []
+    for snapshot_id in snapshot_ids:
+        snapshot = snapshots.load(snapshot_id)
+        for relative_path, entry in snapshot['files'].items():
+            if not entry['chunks'] and entry['size']:
+                problems.append(f'{snapshot_id}: {relative_path} has no chunks')
+            for chunk_id in entry['chunks']:
+                referenced.setdefault(chunk_id, (snapshot_id, relative_path))
+    for chunk_id, (snapshot_id, relative_path) in referenced.items():
+        try:
+            if full:
+                chunks.get(chunk_id)
+            elif not chunks.has(chunk_id):
+                raise ChunkStoreError(f'chunk {chunk_id} is missing')
+        except ChunkStoreError as exc:
+            problems.append(f'{snapshot_id}: {relative_path}: {exc}')
+    return len(referenced), problems
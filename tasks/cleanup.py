@@ -0,0 +1,145 @@
+import datetime
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+
+# Tables Database Cleanup may prune, with the timestamp columns it may age
+# rows by (the first is the default). Each table needs an integer primary key.
+RETENTION_TABLES = {
+    'execution_logs': ('started_at', 'completed_at'),
+    'execution_runs': ('scheduled_at', 'completed_at'),
+    'schedule_changes': ('created_at',),
+    'schedule_fires': ('claimed_at', 'fire_time'),
+}
+# Names schedules created before the table list existed may still carry
+TABLE_ALIASES = {
+    'logs': 'execution_logs',
+}
+
+
+class CleanupError(ValueError):
+    pass
+
+
+def model_for_table(table_name):
+    for model in apps.get_models():
+        if model._meta.db_table == table_name:
+            return model
+    raise CleanupError(f'table {table_name} has no model')
+
+
+def previous_progress(schedule, table_name, timestamp_column):
+    """Where the schedule's last run stopped, if it ran out of time on the same table."""
+    from executions.models import ExecutionLog
+
+    result = ExecutionLog.objects.filter(
+        schedule=schedule, status='success', result__isnull=False
+    ).order_by('-started_at').values_list('result', flat=True).first()
+    if (
+        isinstance(result, dict)
+        and result.get('table_name') == table_name
+        and result.get('timestamp_column') == timestamp_column
+        and not result.get('complete', True)
+    ):
+        return result.get('next_pk')
+    return None
+
+
+class RetentionEngine:
+    """Delete rows older than a cutoff in short primary-key range batches.
+
+    The upper bound is the largest primary key of an expired row, found once
+    up front. From the first key, each batch finds the key ``batch_size``
+    rows further on and deletes the expired rows in that range in its own
+    transaction. Every statement touches a bounded slice of the primary-key
+    index, and locks are held for one batch only, so inserts from workers
+    (which land above the range) keep flowing. The engine pauses between
+    batches. After ``max_runtime`` seconds it stops and reports ``next_pk``,
+    and the schedule's next run resumes from there.
+    """
+
+    def __init__(self, model, timestamp_column, cutoff, batch_size=None, pause=None, max_runtime=None):
+        self.model = model
+        self.timestamp_column = timestamp_column
+        self.cutoff = cutoff
+        self.batch_size = batch_size or settings.DATABASE_CLEANUP_BATCH_SIZE
+        self.pause = settings.DATABASE_CLEANUP_PAUSE if pause is None else pause
+        self.max_runtime = max_runtime or settings.DATABASE_CLEANUP_MAX_RUNTIME
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        table_name = parameters.get('table_name', 'execution_logs')
+        table_name = TABLE_ALIASES.get(table_name, table_name)
+        if table_name not in RETENTION_TABLES:
+            raise CleanupError(f"table_name must be one of {', '.join(sorted(RETENTION_TABLES))}")
+        timestamp_column = parameters.get('timestamp_column') or RETENTION_TABLES[table_name][0]
+        if timestamp_column not in RETENTION_TABLES[table_name]:
+            raise CleanupError(
+                f"timestamp_column for {table_name} must be one of {', '.join(RETENTION_TABLES[table_name])}"
+            )
+        cutoff = timezone.now() - datetime.timedelta(days=parameters.get('days_old', 30))
+        return cls(
+            model_for_table(table_name), timestamp_column, cutoff,
+            batch_size=parameters.get('batch_size'),
+            max_runtime=parameters.get('max_runtime'),
+        )
+
+    @property
+    def rows(self):
+        return self.model._base_manager.order_by()
+
+    def expired(self):
+        return self.rows.filter(**{f'{self.timestamp_column}__lt': self.cutoff})
+
+    def last_expired_pk(self):
+        return self.expired().order_by('-pk').values_list('pk', flat=True).first()
+
+    def batch_end(self, start, stop):
+        """Primary key ``batch_size`` rows past ``start`` (or ``stop`` when fewer remain)."""
+        keys = self.rows.filter(pk__gte=start, pk__lte=stop).order_by('pk').values_list('pk', flat=True)
+        end = keys[self.batch_size - 1:self.batch_size].first()
+        return stop if end is None else end
+
+    def delete_range(self, start, end):
+        with transaction.atomic():
+            return self.expired().filter(pk__gte=start, pk__lte=end).delete()[0]
+
+    def run(self, resume_from=None):
+        started = time.monotonic()
+        summary = {'records_deleted': 0, 'batches': 0, 'complete': True, 'next_pk': None}
+        stop = self.last_expired_pk()
+        start = resume_from
+        if start is None and stop is not None:
+            start = self.rows.order_by('pk').values_list('pk', flat=True).first()
+
+        while stop is not None and start is not None and start <= stop:
+            if summary['batches'] and time.monotonic() - started >= self.max_runtime:
+                summary.update(complete=False, next_pk=start)
+                break
+            if summary['batches'] and self.pause:
+                time.sleep(self.pause)
+            end = self.batch_end(start, stop)
+            summary['records_deleted'] += self.delete_range(start, end)
+            summary['batches'] += 1
+            start = end + 1
+
+        elapsed = time.monotonic() - started
+        return {
+            'table_name': self.model._meta.db_table,
+            'timestamp_column': self.timestamp_column,
+            'cutoff': self.cutoff.isoformat(),
+            'resumed_from_pk': resume_from,
+            **summary,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(summary['records_deleted'] / elapsed) if elapsed else None,
+        }
+
+
+def clean_up_table(schedule, parameters):
+    engine = RetentionEngine.from_parameters(parameters)
+    resume_from = previous_progress(schedule, engine.model._meta.db_table, engine.timestamp_column)
+    return {'days_old': parameters.get('days_old', 30), **engine.run(resume_from=resume_from)}
@@ -0,0 +1,196 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+OVERFLOW_DEFER = 'defer'
+OVERFLOW_SKIP = 'skip'
+OVERFLOW_COALESCE = 'coalesce'
+
+# Outcomes of ConcurrencyLimiter.try_enqueue
+ENQUEUED = 'enqueued'
+COALESCED = 'coalesced'
+QUEUE_FULL = 'queue_full'
+
+KEY_PREFIX = 'insighthub:concurrency'
+
+ACQUIRE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if tonumber(redis.call('GET', key) or '0') >= tonumber(ARGV[i]) then
+        return 0
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('INCR', key)
+    redis.call('EXPIRE', key, ARGV[#KEYS + 1])
+end
+return 1
+"""
+
+RELEASE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if tonumber(redis.call('GET', key) or '0') > 0 then
+        redis.call('DECR', key)
+    end
+end
+return 1
+"""
+
+
+class MemoryCounterStore:
+    """Process-local stand-in for RedisCounterStore, for tests and single-process workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._flags = {}
+
+    def acquire(self, limits, ttl):
+        with self._lock:
+            if any(self._counts.get(key, 0) >= limit for key, limit in limits):
+                return False
+            for key, _ in limits:
+                self._counts[key] = self._counts.get(key, 0) + 1
+            return True
+
+    def release(self, keys):
+        with self._lock:
+            for key in keys:
+                if self._counts.get(key, 0) > 0:
+                    self._counts[key] -= 1
+
+    def count(self, key):
+        return self._counts.get(key, 0)
+
+    def set_once(self, key, ttl):
+        with self._lock:
+            now = time.monotonic()
+            if self._flags.get(key, 0) > now:
+                return False
+            self._flags[key] = now + ttl
+            return True
+
+    def clear(self, key):
+        with self._lock:
+            self._flags.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._flags.clear()
+
+
+class RedisCounterStore:
+    """Counters shared by every worker; each multi-key check-and-increment is one Lua call.
+
+    Counters expire after ``ttl`` seconds without a new acquire, so slots held
+    by a worker that died mid-run are eventually given back.
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self._acquire = self.client.register_script(ACQUIRE_SCRIPT)
+        self._release = self.client.register_script(RELEASE_SCRIPT)
+
+    def acquire(self, limits, ttl):
+        if not limits:
+            return True
+        keys = [key for key, _ in limits]
+        return bool(self._acquire(keys=keys, args=[limit for _, limit in limits] + [int(ttl)]))
+
+    def release(self, keys):
+        if keys:
+            self._release(keys=list(keys))
+
+    def count(self, key):
+        return int(self.client.get(key) or 0)
+
+    def set_once(self, key, ttl):
+        return bool(self.client.set(key, 1, nx=True, ex=int(ttl)))
+
+    def clear(self, key):
+        self.client.delete(key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_counter_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.CONCURRENCY_STORE == 'memory':
+                _store = MemoryCounterStore()
+            else:
+                _store = RedisCounterStore(settings.CONCURRENCY_REDIS_URL)
+        return _store
+
+
+class ConcurrencyLimiter:
+    """In-flight and queued run caps per user and per TaskDefinition.
+
+    A run takes one ``running`` slot for its user and task definition before
+    its body starts and gives them back when it ends. A run that finds a cap
+    full is handled by its task definition's overflow policy. ``defer`` and
+    ``coalesce`` re-enqueue it while holding a ``queued`` slot, up to the
+    queue depth. ``coalesce`` also keeps at most one waiting run per schedule.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store or get_counter_store()
+
+    @property
+    def slot_ttl(self):
+        return settings.CONCURRENCY_SLOT_TTL
+
+    def _limits(self, schedule, kind, task_limit, user_limit):
+        limits = []
+        if task_limit:
+            limits.append((f'{KEY_PREFIX}:{kind}:task:{schedule.task_definition_id}', task_limit))
+        if user_limit and not schedule.user.is_superuser:
+            limits.append((f'{KEY_PREFIX}:{kind}:user:{schedule.user_id}', user_limit))
+        return limits
+
+    def running_limits(self, schedule):
+        return self._limits(
+            schedule, 'running', schedule.task_definition.max_concurrency, settings.USER_MAX_CONCURRENT_RUNS
+        )
+
+    def queued_limits(self, schedule):
+        return self._limits(
+            schedule, 'queued', schedule.task_definition.max_queue_depth, settings.USER_MAX_QUEUED_RUNS
+        )
+
+    def pending_key(self, schedule):
+        return f'{KEY_PREFIX}:pending:schedule:{schedule.pk}'
+
+    def try_start(self, schedule):
+        return self.store.acquire(self.running_limits(schedule), self.slot_ttl)
+
+    def finish(self, schedule):
+        self.store.release([key for key, _ in self.running_limits(schedule)])
+
+    def try_enqueue(self, schedule, policy):
+        """Take a queue slot for a deferred run; returns ENQUEUED, COALESCED or QUEUE_FULL."""
+        if policy == OVERFLOW_COALESCE and not self.store.set_once(self.pending_key(schedule), self.slot_ttl):
+            return COALESCED
+        if self.store.acquire(self.queued_limits(schedule), self.slot_ttl):
+            return ENQUEUED
+        if policy == OVERFLOW_COALESCE:
+            self.store.clear(self.pending_key(schedule))
+        return QUEUE_FULL
+
+    def leave_queue(self, schedule):
+        self.store.release([key for key, _ in self.queued_limits(schedule)])
+        self.store.clear(self.pending_key(schedule))
+
+
+concurrency_limiter = ConcurrencyLimiter()
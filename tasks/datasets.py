@@ -0,0 +1,391 @@
+import array
+import codecs
+import csv
+import json
+import math
+import mmap
+import os
+import random
+import sys
+import time
+
+from billiard.pool import Pool
+from django.conf import settings
+
+from .accumulators import QuantileSketch, RunningStats, np
+
+
+CSV_FORMAT = 'csv'
+JSONL_FORMAT = 'jsonl'
+BINARY_FORMAT = 'binary'
+
+FORMATS_BY_EXTENSION = {
+    '.csv': (CSV_FORMAT, None),
+    '.jsonl': (JSONL_FORMAT, None),
+    '.ndjson': (JSONL_FORMAT, None),
+    '.f64': (BINARY_FORMAT, 'd'),
+    '.bin': (BINARY_FORMAT, 'd'),
+    '.f32': (BINARY_FORMAT, 'f'),
+}
+
+REPORTED_QUANTILES = (0.05, 0.25, 0.75, 0.95)
+
+# Parallel runs split the input into a few parts per worker to even out load
+PARTS_PER_WORKER = 4
+MIN_PART_BYTES = 1024 * 1024
+
+
+class DatasetError(ValueError):
+    pass
+
+
+def resolve_source(source_path):
+    """Map a user-supplied path onto DATA_PROCESSING_ROOT, refusing anything outside it."""
+    root = os.path.realpath(settings.DATA_PROCESSING_ROOT)
+    path = os.path.realpath(os.path.join(root, source_path.lstrip('/')))
+    if os.path.commonpath([root, path]) != root:
+        raise DatasetError(f'{source_path} is outside the data directory')
+    if not os.path.isfile(path):
+        raise DatasetError(f'{source_path} does not exist')
+    return path
+
+
+def source_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS_BY_EXTENSION:
+        raise DatasetError(f'Unsupported dataset format {extension or path}')
+    return FORMATS_BY_EXTENSION[extension]
+
+
+def to_chunk(values, typecode='d'):
+    if np is not None:
+        return np.asarray(values, dtype=np.float64 if typecode == 'd' else np.float32)
+    return array.array(typecode, values)
+
+
+class ChunkReader:
+    """Yields a dataset's numeric values in chunks of at most ``chunk_size``.
+
+    Only one chunk is held at a time. ``start``/``end`` restrict reading to a
+    byte range, so separate processes can each take one part of the file. A
+    text record belongs to the range its line starts in. ``skipped`` counts
+    records without a usable number (blank cells, text, missing keys).
+    """
+
+    def __init__(self, path, column=None, chunk_size=None, start=0, end=None):
+        self.path = path
+        self.column = column
+        self.chunk_size = chunk_size or settings.DATA_PROCESSING_CHUNK_SIZE
+        self.start = start
+        self.end = end
+        self.format, self.typecode = source_format(path)
+        self.skipped = 0
+
+    def __iter__(self):
+        if self.format == BINARY_FORMAT:
+            return self._binary_chunks()
+        rows = self._csv_values() if self.format == CSV_FORMAT else self._jsonl_values()
+        return self._batched(rows)
+
+    @property
+    def itemsize(self):
+        return array.array(self.typecode).itemsize if self.format == BINARY_FORMAT else 1
+
+    def data_size(self):
+        return os.path.getsize(self.path) // self.itemsize * self.itemsize
+
+    def split(self, parts):
+        """Byte ranges for about ``parts`` readers, none smaller than MIN_PART_BYTES."""
+        size = self.data_size()
+        step = max(-(-size // max(parts, 1)), MIN_PART_BYTES)
+        step += -step % self.itemsize
+        return [(offset, min(offset + step, size)) for offset in range(0, size, step)]
+
+    def _batched(self, values):
+        chunk = []
+        for value in values:
+            chunk.append(value)
+            if len(chunk) == self.chunk_size:
+                yield to_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield to_chunk(chunk)
+
+    def _number(self, raw):
+        if isinstance(raw, bool):
+            raw = None
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or not math.isfinite(value):
+            self.skipped += 1
+            return None
+        return value
+
+    def _lines(self):
+        with open(self.path, 'rb') as handle:
+            if self.start:
+                # The line straddling start belongs to the previous range
+                handle.seek(self.start - 1)
+                handle.readline()
+            position = handle.tell()
+            for line in handle:
+                if self.end is not None and position >= self.end:
+                    break
+                if position == 0 and line.startswith(codecs.BOM_UTF8):
+                    line = line[len(codecs.BOM_UTF8):]
+                position += len(line)
+                yield line.decode('utf-8', errors='replace')
+
+    def csv_layout(self):
+        """Index of the value column and whether the file starts with a header row."""
+        with open(self.path, newline='', encoding='utf-8-sig', errors='replace') as handle:
+            header = next(csv.reader(handle), None)
+        if header is None:
+            return 0, False
+        if self.column and not self.column.isdigit():
+            if self.column not in header:
+                raise DatasetError(f'Column {self.column} not found in {os.path.basename(self.path)}')
+            return header.index(self.column), True
+        index = int(self.column) if self.column else 0
+        # A first row that doesn't parse is a header, not a skipped record
+        try:
+            float(header[index])
+        except (IndexError, ValueError):
+            return index, True
+        return index, False
+
+    def _csv_values(self):
+        index, has_header = self.csv_layout()
+        rows = csv.reader(self._lines())
+        if has_header and not self.start:
+            next(rows, None)
+        for row in rows:
+            value = self._number(row[index] if index < len(row) else None)
+            if value is not None:
+                yield value
+
+    def _jsonl_values(self):
+        for line in self._lines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                self.skipped += 1
+                continue
+            if isinstance(record, dict):
+                if not self.column:
+                    raise DatasetError('column is required for JSON object records')
+                record = record.get(self.column)
+            value = self._number(record)
+            if value is not None:
+                yield value
+
+    def _binary_chunks(self):
+        # Raw little-endian floats, mapped rather than read so pages are loaded on demand
+        itemsize = self.itemsize
+        size = self.data_size() if self.end is None else self.end
+        if size <= self.start:
+            return
+        step = self.chunk_size * itemsize
+        with open(self.path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(self.start, size, step):
+                end = min(offset + step, size)
+                if np is not None:
+                    chunk = np.frombuffer(mapped, dtype='<f8' if self.typecode == 'd' else '<f4',
+                                          count=(end - offset) // itemsize, offset=offset)
+                    finite = np.isfinite(chunk)
+                    if not finite.all():
+                        self.skipped += int(chunk.size - np.count_nonzero(finite))
+                        chunk = chunk[finite]
+                    # Copy out of the map so no view outlives it
+                    yield chunk.astype(np.float64)
+                else:
+                    chunk = array.array(self.typecode)
+                    chunk.frombytes(mapped[offset:end])
+                    if sys.byteorder == 'big':
+                        chunk.byteswap()
+                    finite = [value for value in chunk if math.isfinite(value)]
+                    self.skipped += len(chunk) - len(finite)
+                    yield finite
+
+
+def synthetic_chunks(dataset_size, chunk_size=None, seed=0):
+    """``dataset_size`` normally distributed values, generated chunk by chunk."""
+    chunk_size = chunk_size or settings.DATA_PROCESSING_CHUNK_SIZE
+    if np is not None:
+        generator = np.random.default_rng(seed)
+        for offset in range(0, dataset_size, chunk_size):
+            yield generator.normal(50.0, 15.0, min(chunk_size, dataset_size - offset))
+        return
+    generator = random.Random(seed)
+    for offset in range(0, dataset_size, chunk_size):
+        yield array.array('d', (generator.gauss(50.0, 15.0) for _ in range(min(chunk_size, dataset_size - offset))))
+
+
+class DatasetSummary:
+    """Running statistics for one dataset; ``complex`` also keeps a quantile sketch."""
+
+    def __init__(self, with_quantiles=False, accuracy=None):
+        self.stats = RunningStats()
+        self.sketch = None
+        if with_quantiles:
+            self.sketch = QuantileSketch(accuracy or settings.DATA_PROCESSING_QUANTILE_ACCURACY)
+
+    def update(self, chunk):
+        self.stats.update(chunk)
+        if self.sketch is not None:
+            self.sketch.update(chunk)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def statistics(self):
+        stats = self.stats
+        if not stats.count:
+            return {}
+        result = {
+            'mean': stats.mean,
+            'std_dev': stats.std_dev,
+            'min': stats.minimum,
+            'max': stats.maximum,
+        }
+        if self.sketch is not None:
+            result['median'] = self.sketch.quantile(0.5)
+            for q in REPORTED_QUANTILES:
+                result[f'p{round(q * 100):02d}'] = self.sketch.quantile(q)
+        return result
+
+
+class DatasetPart:
+    """One unit of work: a byte range of a file, or a slice of the synthetic dataset.
+
+    Parts carry everything they need, so they can be summarized in another
+    process and their summaries merged afterwards.
+    """
+
+    __slots__ = ('path', 'column', 'start', 'end', 'count', 'seed', 'chunk_size', 'with_quantiles', 'accuracy')
+
+    def __init__(self, chunk_size, with_quantiles, accuracy, path=None, column=None, start=0, end=None,
+                 count=0, seed=0):
+        self.path = path
+        self.column = column
+        self.start = start
+        self.end = end
+        self.count = count
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.with_quantiles = with_quantiles
+        self.accuracy = accuracy
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def summarize(self):
+        summary = DatasetSummary(self.with_quantiles, self.accuracy)
+        if self.path is None:
+            for chunk in synthetic_chunks(self.count, self.chunk_size, self.seed):
+                summary.update(chunk)
+            return summary, 0
+        reader = ChunkReader(self.path, self.column, self.chunk_size, self.start, self.end)
+        for chunk in reader:
+            summary.update(chunk)
+        return summary, reader.skipped
+
+
+def summarize_part(part):
+    return part.summarize()
+
+
+def plan_parts(parameters, seed, chunk_size, with_quantiles, parts):
+    options = {
+        'chunk_size': chunk_size,
+        'with_quantiles': with_quantiles,
+        'accuracy': settings.DATA_PROCESSING_QUANTILE_ACCURACY,
+    }
+    source_path = parameters.get('source_path')
+    if source_path:
+        path = resolve_source(source_path)
+        column = parameters.get('column')
+        if parts == 1:
+            return [DatasetPart(path=path, column=column, **options)]
+        reader = ChunkReader(path, column, chunk_size)
+        if reader.format == CSV_FORMAT:
+            # Surface a bad column once, before any worker starts
+            reader.csv_layout()
+        return [
+            DatasetPart(path=path, column=column, start=start, end=end, **options)
+            for start, end in reader.split(parts)
+        ]
+
+    dataset_size = parameters.get('dataset_size', 1000)
+    if parts == 1:
+        return [DatasetPart(count=dataset_size, seed=seed, **options)]
+    step = max(-(-dataset_size // parts), chunk_size)
+    return [
+        # Each slice gets its own stream; integer seeds work for NumPy and random alike
+        DatasetPart(count=min(step, dataset_size - offset), seed=seed * 1000003 + index, **options)
+        for index, offset in enumerate(range(0, dataset_size, step))
+    ]
+
+
+def process_dataset(parameters, seed=0):
+    """Stream a dataset through DatasetSummaries and build the task result.
+
+    With ``workers`` above one, the dataset is split into PARTS_PER_WORKER
+    parts per worker. The parts are summarized in a billiard process pool
+    (billiard works from inside a Celery prefork child) and the partial
+    summaries are merged.
+    """
+    processing_type = parameters.get('processing_type', 'simple')
+    source_path = parameters.get('source_path')
+    workers = max(1, min(parameters.get('workers') or 1, settings.DATA_PROCESSING_MAX_WORKERS))
+    chunk_size = parameters.get('chunk_size') or settings.DATA_PROCESSING_CHUNK_SIZE
+    started = time.monotonic()
+
+    parts = plan_parts(
+        parameters, seed, chunk_size, processing_type == 'complex', workers * PARTS_PER_WORKER if workers > 1 else 1
+    )
+    workers = min(workers, len(parts))
+    if workers > 1:
+        # apply_async rather than imap: billiard workers only exit promptly
+        # once the pool has acknowledged each of their results
+        pool = Pool(workers)
+        try:
+            pending = [pool.apply_async(summarize_part, (part,)) for part in parts]
+            partials = [result.get() for result in pending]
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        partials = [part.summarize() for part in parts]
+
+    # Fold from an empty summary: an empty source splits into no parts at all
+    summary = DatasetSummary(processing_type == 'complex', settings.DATA_PROCESSING_QUANTILE_ACCURACY)
+    skipped = 0
+    for partial, partial_skipped in partials:
+        summary.merge(partial)
+        skipped += partial_skipped
+
+    result = {
+        'processed_records': summary.stats.count,
+        'processing_type': processing_type,
+        'statistics': summary.statistics(),
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+    }
+    if workers > 1:
+        result['workers'] = workers
+        result['parts'] = len(parts)
+    if source_path:
+        result['source_path'] = source_path
+        result['skipped_records'] = skipped
+    return result
@@ -0,0 +1,191 @@
+import os
+import smtplib
+import threading
+import time
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.smtp import EmailBackend
+
+
+class PooledEmailBackend(EmailBackend):
+    """SMTP backend that keeps its connection open between sends.
+
+    The stock backend logs in and quits on every ``send_messages`` call. This
+    one reuses the connection and drops it after ``max_messages`` messages,
+    or when it has been idle for ``idle_timeout`` seconds and fails a NOOP.
+    A send that finds the server gone reconnects and tries once more.
+    """
+
+    def __init__(self, idle_timeout=None, max_messages=None, **kwargs):
+        super().__init__(**kwargs)
+        self.idle_timeout = settings.EMAIL_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.max_messages = settings.EMAIL_POOL_MAX_MESSAGES if max_messages is None else max_messages
+        self._last_used = 0.0
+        self._sent_on_connection = 0
+
+    def send_messages(self, email_messages):
+        outcomes = self.send_each(email_messages)
+        if not self.fail_silently:
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    raise outcome
+        return sum(1 for outcome in outcomes if outcome is True)
+
+    def send_each(self, email_messages):
+        """Send every message over the shared connection; one outcome per message.
+
+        An outcome is ``True`` when sent, ``False`` when the message had no
+        recipients, or the exception that message raised.
+        """
+        outcomes = []
+        with self._lock:
+            for message in email_messages:
+                try:
+                    outcomes.append(self._send_pooled(message))
+                except Exception as exc:
+                    outcomes.append(exc)
+        return outcomes
+
+    def _send_pooled(self, message):
+        for attempt in range(2):
+            self._ensure_open()
+            try:
+                sent = self._send(message)
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                if attempt:
+                    raise
+                continue
+            self._sent_on_connection += 1
+            self._last_used = time.monotonic()
+            return bool(sent)
+
+    def _ensure_open(self):
+        if self.connection is not None:
+            worn_out = self.max_messages and self._sent_on_connection >= self.max_messages
+            idle = time.monotonic() - self._last_used > self.idle_timeout
+            if worn_out or (idle and not self._alive()):
+                self.close()
+        if self.connection is None:
+            self.open()
+            self._sent_on_connection = 0
+            self._last_used = time.monotonic()
+
+    def _alive(self):
+        try:
+            return self.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+
+def send_each(connection, messages):
+    if hasattr(connection, 'send_each'):
+        return connection.send_each(messages)
+    try:
+        connection.send_messages(messages)
+    except Exception as exc:
+        return [exc] * len(messages)
+    return [True] * len(messages)
+
+
+class _Pending:
+    __slots__ = ('message', 'outcome', 'done')
+
+    def __init__(self, message):
+        self.message = message
+        self.outcome = None
+        self.done = threading.Event()
+
+
+class MailBatcher:
+    """Groups messages sent at about the same time into one ``send_messages`` call.
+
+    The first sender to arrive waits up to ``window`` seconds, or until
+    ``max_size`` messages are pending, and then delivers the whole group
+    over the worker's connection. Every sender blocks until its own message
+    has gone out and sees only its own error. This only groups messages when
+    tasks run concurrently in one process (thread or gevent pools). With a
+    zero window each message is sent on its own over the pooled connection.
+    """
+
+    def __init__(self, max_size=None, window=None):
+        self._max_size = max_size
+        self._window = window
+        self._pending = []
+        self._condition = threading.Condition()
+        self._connection = None
+        self._connection_pid = None
+        self._connection_lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.EMAIL_BATCH_SIZE
+
+    @property
+    def window(self):
+        return settings.EMAIL_BATCH_WINDOW if self._window is None else self._window
+
+    @property
+    def connection(self):
+        # One connection per worker process; prefork children must not share the parent's socket
+        with self._connection_lock:
+            if self._connection is None or self._connection_pid != os.getpid():
+                self._connection = get_connection()
+                self._connection_pid = os.getpid()
+            return self._connection
+
+    def send(self, message):
+        if self.window <= 0 or self.max_size <= 1:
+            outcome = send_each(self.connection, [message])[0]
+        else:
+            outcome = self._send_grouped(message)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def _send_grouped(self, message):
+        pending = _Pending(message)
+        batch = None
+        with self._condition:
+            self._pending.append(pending)
+            if len(self._pending) == 1:
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch, self._pending = self._pending, []
+            elif len(self._pending) >= self.max_size:
+                self._condition.notify_all()
+
+        if batch is not None:
+            self._deliver(batch)
+        pending.done.wait()
+        return pending.outcome
+
+    def _deliver(self, batch):
+        try:
+            outcomes = send_each(self.connection, [pending.message for pending in batch])
+        except Exception as exc:
+            outcomes = [exc] * len(batch)
+        for pending, outcome in zip(batch, outcomes):
+            pending.outcome = outcome
+            pending.done.set()
+
+    def close(self):
+        with self._connection_lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+mail_batcher = MailBatcher()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_mail_connection(**kwargs):
+    mail_batcher.close()
@@ -0,0 +1,48 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.backups import BackupError, contained_path
+from tasks.chunkstore import ChunkStore, ChunkStoreError, SnapshotStore, restore_file
+
+
+class Command(BaseCommand):
+    help = 'Restore files from a chunked file backup snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('destination', help='Backup destination the snapshot was written to')
+        parser.add_argument('target', help='Directory to restore into; existing files are overwritten')
+        parser.add_argument('--snapshot', help='Snapshot id (default: the latest)')
+        parser.add_argument(
+            '--include', action='append', default=[],
+            help='Only restore paths under this prefix (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        snapshots = SnapshotStore(options['destination'])
+        chunks = ChunkStore(options['destination'])
+        try:
+            snapshot = snapshots.load(options['snapshot'])
+        except ChunkStoreError as exc:
+            raise CommandError(str(exc))
+
+        prefixes = [prefix.strip('/') for prefix in options['include']]
+        restored = restored_bytes = 0
+        for relative_path, entry in sorted(snapshot['files'].items()):
+            if prefixes and not any(
+                relative_path == prefix or relative_path.startswith(prefix + os.sep) for prefix in prefixes
+            ):
+                continue
+            try:
+                target = contained_path(relative_path, options['target'], 'path')
+                restore_file(chunks, entry, target)
+            except (BackupError, ChunkStoreError) as exc:
+                raise CommandError(f'{relative_path}: {exc}')
+            restored += 1
+            restored_bytes += entry['size']
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Restored {restored} files ({restored_bytes / 1e6:.1f}MB) from snapshot {snapshot['id']}"
+            )
+        )
@@ -11,18 +11,24 @@ class Command(BaseCommand):
                 'name': 'Send Email',
                 'description': 'Send an email with optional delay',
                 'celery_task_name': 'tasks.celery_tasks.send_email_task',
+                'queue': 'email',
                 'input_schema': {
                     'email': 'string',
-                    'delay': 'integer'
+                    'delay': {'type': 'integer', 'min': 0, 'max': 3600}
                 }
             },
             {
                 'name': 'Data Processing',
                 'description': 'Process dataset with specified parameters',
                 'celery_task_name': 'tasks.celery_tasks.data_processing_task',
+                'queue': 'batch',
                 'input_schema': {
                     'dataset_size': 'integer',
-                    'processing_type': 'string'
+                    'processing_type': 'string',
+                    'source_path': 'string',
+                    'column': 'string',
+                    'workers': {'type': 'integer', 'min': 1, 'max': 64},
+                    'chunk_size': {'type': 'integer', 'min': 1024, 'max': 4194304}
                 }
             },
             {
@@ -31,17 +37,22 @@ class Command(BaseCommand):
                 'celery_task_name': 'tasks.celery_tasks.generate_report_task',
                 'input_schema': {
                     'report_type': 'string',
-                    'include_charts': 'boolean'
+                    'include_charts': 'boolean',
+                    'format': 'string',
+                    'days': {'type': 'integer', 'min': 1, 'max': 3660}
                 }
             },
             {
                 'name': 'File Backup',
                 'description': 'Backup files to specified location',
                 'celery_task_name': 'tasks.celery_tasks.file_backup_task',
+                'queue': 'batch',
                 'input_schema': {
                     'source_path': 'string',
                     'destination': 'string',
-                    'compress': 'boolean'
+                    'compress': 'boolean',
+                    'format': 'string',
+                    'parallelism': {'type': 'integer', 'min': 1, 'max': 64}
                 }
             },
             {
@@ -49,8 +60,11 @@ class Command(BaseCommand):
                 'description': 'Clean up old database records',
                 'celery_task_name': 'tasks.celery_tasks.database_cleanup_task',
                 'input_schema': {
-                    'days_old': 'integer',
-                    'table_name': 'string'
+                    'days_old': {'type': 'integer', 'min': 1, 'max': 3660},
+                    'table_name': 'string',
+                    'timestamp_column': 'string',
+                    'batch_size': {'type': 'integer', 'min': 100, 'max': 100000},
+                    'max_runtime': {'type': 'integer', 'min': 1, 'max': 86400}
                 }
             }
         ]
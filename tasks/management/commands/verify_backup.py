@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.chunkstore import ChunkStoreError, SnapshotStore, verify_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Check that chunked file backup snapshots reference only intact chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('destination', help='Backup destination to check')
+        parser.add_argument('--snapshot', help='Snapshot id (default: the latest)')
+        parser.add_argument('--all', action='store_true', help='Check every snapshot')
+        parser.add_argument('--full', action='store_true', help='Read and re-hash every chunk')
+
+    def handle(self, *args, **options):
+        snapshots = SnapshotStore(options['destination'])
+        if options['all']:
+            snapshot_ids = snapshots.ids()
+        else:
+            snapshot_ids = [options['snapshot'] or snapshots.latest_id()]
+        if not snapshot_ids or snapshot_ids == [None]:
+            raise CommandError('no snapshots found')
+
+        try:
+            checked, problems = verify_snapshots(options['destination'], snapshot_ids, full=options['full'])
+        except ChunkStoreError as exc:
+            raise CommandError(str(exc))
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(f'{len(problems)} problems in {len(snapshot_ids)} snapshots')
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(snapshot_ids)} snapshots OK, {checked} chunks checked')
+        )
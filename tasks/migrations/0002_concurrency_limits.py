@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='max_concurrency',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='max_queue_depth',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='overflow_policy',
+            field=models.CharField(choices=[('defer', 'Defer'), ('skip', 'Skip'), ('coalesce', 'Coalesce')], default='defer', max_length=20),
+        ),
+    ]
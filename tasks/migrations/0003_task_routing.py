@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:40
+
+import django.core.validators
+from django.utils import timezone
+from django.db import migrations, models
+
+
+BUILTIN_QUEUES = {
+    'tasks.celery_tasks.send_email_task': 'email',
+    'tasks.celery_tasks.data_processing_task': 'batch',
+    'tasks.celery_tasks.file_backup_task': 'batch',
+}
+
+
+def route_builtin_tasks(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+
+    for celery_task_name, queue in BUILTIN_QUEUES.items():
+        TaskDefinition.objects.filter(celery_task_name=celery_task_name, queue='').update(queue=queue)
+        PeriodicTask.objects.filter(
+            name__startswith='schedule_', task=celery_task_name, queue__isnull=True
+        ).update(queue=queue)
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={'last_update': timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_concurrency_limits'),
+        ('django_celery_beat', '0018_improve_crontab_helptext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='priority',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(9)]),
+        ),
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='queue',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='taskdefinition',
+            name='routing_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(route_builtin_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+EMAIL_TASK = 'tasks.celery_tasks.send_email_task'
+BOUNDED_DELAY = {'type': 'integer', 'min': 0, 'max': 3600}
+
+
+def bound_email_delay(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=EMAIL_TASK):
+        if task_definition.input_schema.get('delay') == 'integer':
+            task_definition.input_schema['delay'] = BOUNDED_DELAY
+            task_definition.save(update_fields=['input_schema'])
+
+
+def unbound_email_delay(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=EMAIL_TASK):
+        if task_definition.input_schema.get('delay') == BOUNDED_DELAY:
+            task_definition.input_schema['delay'] = 'integer'
+            task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_routing'),
+    ]
+
+    operations = [
+        migrations.RunPython(bound_email_delay, unbound_email_delay),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+DATA_PROCESSING_TASK = 'tasks.celery_tasks.data_processing_task'
+SOURCE_FIELDS = {'source_path': 'string', 'column': 'string'}
+
+
+def add_source_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATA_PROCESSING_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, **SOURCE_FIELDS}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_source_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATA_PROCESSING_TASK):
+        for field_name in SOURCE_FIELDS:
+            task_definition.input_schema.pop(field_name, None)
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_bound_email_delay'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_source_fields, remove_source_fields),
+    ]
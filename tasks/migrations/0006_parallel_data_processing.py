@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+DATA_PROCESSING_TASK = 'tasks.celery_tasks.data_processing_task'
+PARALLEL_FIELDS = {
+    'workers': {'type': 'integer', 'min': 1, 'max': 64},
+    'chunk_size': {'type': 'integer', 'min': 1024, 'max': 4194304},
+}
+
+
+def add_parallel_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATA_PROCESSING_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, **PARALLEL_FIELDS}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_parallel_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATA_PROCESSING_TASK):
+        for field_name in PARALLEL_FIELDS:
+            task_definition.input_schema.pop(field_name, None)
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_dataset_sources'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_parallel_fields, remove_parallel_fields),
+    ]
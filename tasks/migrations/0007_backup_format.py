@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+FILE_BACKUP_TASK = 'tasks.celery_tasks.file_backup_task'
+
+
+def add_format_field(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=FILE_BACKUP_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, 'format': 'string'}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_format_field(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=FILE_BACKUP_TASK):
+        task_definition.input_schema.pop('format', None)
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_parallel_data_processing'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_format_field, remove_format_field),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+FILE_BACKUP_TASK = 'tasks.celery_tasks.file_backup_task'
+PARALLELISM_FIELD = {'type': 'integer', 'min': 1, 'max': 64}
+
+
+def add_parallelism_field(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=FILE_BACKUP_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, 'parallelism': PARALLELISM_FIELD}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_parallelism_field(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=FILE_BACKUP_TASK):
+        task_definition.input_schema.pop('parallelism', None)
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_backup_format'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_parallelism_field, remove_parallelism_field),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+DATABASE_CLEANUP_TASK = 'tasks.celery_tasks.database_cleanup_task'
+CLEANUP_FIELDS = {
+    'days_old': {'type': 'integer', 'min': 1},
+    'timestamp_column': 'string',
+    'batch_size': {'type': 'integer', 'min': 100, 'max': 100000},
+    'max_runtime': {'type': 'integer', 'min': 1, 'max': 86400},
+}
+
+
+def add_cleanup_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATABASE_CLEANUP_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, **CLEANUP_FIELDS}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_cleanup_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATABASE_CLEANUP_TASK):
+        for field_name in CLEANUP_FIELDS:
+            task_definition.input_schema.pop(field_name, None)
+        task_definition.input_schema['days_old'] = 'integer'
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_backup_parallelism'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_cleanup_fields, remove_cleanup_fields),
+    ]
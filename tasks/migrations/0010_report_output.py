@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+GENERATE_REPORT_TASK = 'tasks.celery_tasks.generate_report_task'
+REPORT_FIELDS = {
+    'format': 'string',
+    'days': {'type': 'integer', 'min': 1, 'max': 3660},
+}
+
+
+def add_report_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=GENERATE_REPORT_TASK):
+        task_definition.input_schema = {**task_definition.input_schema, **REPORT_FIELDS}
+        task_definition.save(update_fields=['input_schema'])
+
+
+def remove_report_fields(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=GENERATE_REPORT_TASK):
+        for field_name in REPORT_FIELDS:
+            task_definition.input_schema.pop(field_name, None)
+        task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_batched_database_cleanup'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_report_fields, remove_report_fields),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+DATABASE_CLEANUP_TASK = 'tasks.celery_tasks.database_cleanup_task'
+UNBOUNDED_AGE = {'type': 'integer', 'min': 1}
+BOUNDED_AGE = {'type': 'integer', 'min': 1, 'max': 3660}
+
+
+def bound_cleanup_age(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATABASE_CLEANUP_TASK):
+        if task_definition.input_schema.get('days_old') in ('integer', UNBOUNDED_AGE):
+            task_definition.input_schema['days_old'] = BOUNDED_AGE
+            task_definition.save(update_fields=['input_schema'])
+
+
+def unbound_cleanup_age(apps, schema_editor):
+    TaskDefinition = apps.get_model('tasks', 'TaskDefinition')
+    for task_definition in TaskDefinition.objects.filter(celery_task_name=DATABASE_CLEANUP_TASK):
+        if task_definition.input_schema.get('days_old') == BOUNDED_AGE:
+            task_definition.input_schema['days_old'] = UNBOUNDED_AGE
+            task_definition.save(update_fields=['input_schema'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_report_output'),
+    ]
+
+    operations = [
+        migrations.RunPython(bound_cleanup_age, unbound_cleanup_age),
+    ]
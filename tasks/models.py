@@ -1,12 +1,30 @@
+from django.core.validators import MaxValueValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .concurrency import OVERFLOW_COALESCE, OVERFLOW_DEFER, OVERFLOW_SKIP
+from .registry import task_registry
 
 
 class TaskDefinition(models.Model):
+    OVERFLOW_POLICY_CHOICES = [
+        (OVERFLOW_DEFER, 'Defer'),
+        (OVERFLOW_SKIP, 'Skip'),
+        (OVERFLOW_COALESCE, 'Coalesce'),
+    ]
+    
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField()
     celery_task_name = models.CharField(max_length=200, unique=True)
     input_schema = models.JSONField(default=dict)
     is_active = models.BooleanField(default=True)
+    max_concurrency = models.PositiveIntegerField(null=True, blank=True)
+    max_queue_depth = models.PositiveIntegerField(null=True, blank=True)
+    overflow_policy = models.CharField(max_length=20, choices=OVERFLOW_POLICY_CHOICES, default=OVERFLOW_DEFER)
+    # Blank queue/routing key fall back to Celery's defaults
+    queue = models.CharField(max_length=100, blank=True, default='')
+    routing_key = models.CharField(max_length=100, blank=True, default='')
+    priority = models.PositiveSmallIntegerField(null=True, blank=True, validators=[MaxValueValidator(9)])
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -24,21 +42,39 @@ class TaskDefinition(models.Model):
     def input_fields(self):
         return list(self.input_schema.keys())
         
+    def routing_options(self):
+        """Celery publish options for runs of this task."""
+        options = {}
+        if self.queue:
+            options['queue'] = self.queue
+        if self.routing_key:
+            options['routing_key'] = self.routing_key
+        if self.priority is not None:
+            options['priority'] = self.priority
+        return options
+        
+    def periodic_task_routing(self):
+        return {
+            'queue': self.queue or None,
+            'routing_key': self.routing_key or None,
+            'priority': self.priority,
+        }
+        
     def validate_parameters(self, parameters):
-        errors = {}
-        schema_fields = self.input_schema or {}
-        provided_fields = parameters.keys() if isinstance(parameters, dict) else []
-        for unknown in set(provided_fields) - set(schema_fields.keys()):
-            errors[unknown] = f"{unknown} is not a valid parameter"
-        for field_name, field_type in schema_fields.items():
-            if field_name in parameters:
-                value = parameters[field_name]
-                if field_type == 'string' and not isinstance(value, str):
-                    errors[field_name] = f"{field_name} must be a string"
-                elif field_type == 'integer' and not isinstance(value, int):
-                    errors[field_name] = f"{field_name} must be an integer"
-                elif field_type == 'boolean' and not isinstance(value, bool):
-                    errors[field_name] = f"{field_name} must be a boolean"
-                elif field_type == 'float' and not isinstance(value, (int, float)):
-                    errors[field_name] = f"{field_name} must be a number"
-        return errors
\ No newline at end of file
+        return task_registry.validator_for(self).validate(parameters)
+
+
+@receiver([post_save, post_delete], sender=TaskDefinition)
+def invalidate_task_registry(sender, **kwargs):
+    task_registry.invalidate()
+
+
+@receiver(post_save, sender=TaskDefinition)
+def sync_periodic_task_routing(sender, instance, **kwargs):
+    from django_celery_beat.models import PeriodicTask, PeriodicTasks
+
+    updated = PeriodicTask.objects.filter(
+        name__startswith='schedule_', task=instance.celery_task_name
+    ).update(**instance.periodic_task_routing())
+    if updated:
+        PeriodicTasks.update_changed()
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+TYPE_CHECKS = {
+    'string': (str, 'must be a string'),
+    'integer': (int, 'must be an integer'),
+    'boolean': (bool, 'must be a boolean'),
+    'float': ((int, float), 'must be a number'),
+}
+
+
+def field_spec(spec):
+    """Normalize a schema entry: ``'integer'`` or ``{'type': 'integer', 'min': 0, 'max': 10}``."""
+    if isinstance(spec, dict):
+        return spec
+    return {'type': spec}
+
+
+class ParameterValidator:
+    """An input_schema compiled once into per-field type and range checks."""
+
+    def __init__(self, input_schema):
+        self.schema = dict(input_schema or {})
+        self.fields = frozenset(self.schema)
+        self.checks = []
+        self.bounds = []
+        for field_name, spec in self.schema.items():
+            spec = field_spec(spec)
+            if spec.get('type') not in TYPE_CHECKS:
+                continue
+            expected, message = TYPE_CHECKS[spec['type']]
+            self.checks.append((field_name, expected, f"{field_name} {message}"))
+            if spec.get('min') is not None or spec.get('max') is not None:
+                self.bounds.append((field_name, spec.get('min'), spec.get('max')))
+
+    def validate(self, parameters):
+        if not isinstance(parameters, dict):
+            return {'parameters': 'parameters must be an object'}
+        errors = {}
+        for unknown in parameters.keys() - self.fields:
+            errors[unknown] = f"{unknown} is not a valid parameter"
+        for field_name, expected, message in self.checks:
+            if field_name in parameters and not isinstance(parameters[field_name], expected):
+                errors[field_name] = message
+        for field_name, low, high in self.bounds:
+            value = parameters.get(field_name)
+            if field_name in errors or value is None:
+                continue
+            if low is not None and value < low:
+                errors[field_name] = f"{field_name} must be at least {low}"
+            elif high is not None and value > high:
+                errors[field_name] = f"{field_name} must be at most {high}"
+        return errors
+
+
+class TaskDefinitionRegistry:
+    """Process-local cache of active TaskDefinitions and their validators.
+
+    Saves and deletes in this process invalidate it immediately; other
+    processes pick changes up after TASK_REGISTRY_TTL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definitions = None
+        self._validators = {}
+        self._loaded_at = 0.0
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'TASK_REGISTRY_TTL', 60)
+
+    def _load(self):
+        from .models import TaskDefinition
+
+        with self._lock:
+            if self._definitions is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._definitions = {
+                    task_definition.pk: task_definition
+                    for task_definition in TaskDefinition.objects.filter(is_active=True)
+                }
+                self._validators = {}
+                self._loaded_at = time.monotonic()
+            return self._definitions
+
+    def active(self):
+        return sorted(self._load().values(), key=lambda task_definition: task_definition.name)
+
+    def by_task_name(self, celery_task_name):
+        for task_definition in self._load().values():
+            if task_definition.celery_task_name == celery_task_name:
+                return task_definition
+        return None
+
+    def get(self, pk):
+        try:
+            return self._load().get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def validator_for(self, task_definition):
+        validator = self._validators.get(task_definition.pk)
+        if validator is None or validator.schema != (task_definition.input_schema or {}):
+            validator = ParameterValidator(task_definition.input_schema)
+            if task_definition.pk is not None:
+                self._validators[task_definition.pk] = validator
+        return validator
+
+    def invalidate(self):
+        with self._lock:
+            self._definitions = None
+            self._validators = {}
+
+
+task_registry = TaskDefinitionRegistry()
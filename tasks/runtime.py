@@ -0,0 +1,254 @@
+import functools
+
+from celery import Task, shared_task
+from celery.signals import before_task_publish
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from executions.buffer import execution_log_buffer
+from executions.runs import CLAIMED, abandon_run, claim_run, finish_run
+from schedules.misfire import misfire_status
+from .concurrency import COALESCED, ENQUEUED, OVERFLOW_SKIP, concurrency_limiter
+from .registry import field_spec
+
+
+LOG_MODE_RUNNING = 'running'
+LOG_MODE_COMPLETION = 'completion'
+LOG_MODE_BATCHED = 'batched'
+
+LOG_COMPLETION_FIELDS = ['status', 'result', 'error_message', 'completed_at', 'execution_time']
+LOG_START_FIELDS = ['started_at', 'run', 'attempt'] + LOG_COMPLETION_FIELDS
+
+
+class ScheduledTask(Task):
+    """Celery base task that owns the ExecutionLog lifecycle of a schedule run.
+
+    ``running`` mode inserts a running row up front and finishes it with a
+    targeted update; ``completion`` mode writes a single row once the run ends;
+    ``batched`` mode hands finished rows to the worker's write-behind buffer.
+    """
+
+    retry_countdown = 60
+    retry_backoff = 1
+    max_retries = 3
+    # Parameter holding seconds to wait before the body runs
+    delay_parameter = None
+
+    @property
+    def log_mode(self):
+        return getattr(settings, 'EXECUTION_LOG_MODE', LOG_MODE_RUNNING)
+
+    def get_retry_countdown(self):
+        return self.retry_countdown * (self.retry_backoff ** self.request.retries)
+
+    def existing_log_pk(self):
+        from executions.models import ExecutionLog
+
+        return ExecutionLog.objects.filter(celery_task_id=self.request.id).values_list('pk', flat=True).first()
+
+    def start_log(self, schedule, run=None):
+        from executions.models import ExecutionLog
+
+        execution_log = ExecutionLog(
+            schedule=schedule,
+            celery_task_id=self.request.id,
+            run=run,
+            attempt=run.attempts if run is not None else self.request.retries + 1,
+            status='running',
+            started_at=timezone.now()
+        )
+        if self.request.retries:
+            # Retries keep the task id, so they reuse the row of the first attempt
+            execution_log.pk = self.existing_log_pk()
+        if self.log_mode == LOG_MODE_RUNNING:
+            if execution_log.pk is None:
+                execution_log.save(force_insert=True)
+            else:
+                execution_log.save(update_fields=LOG_START_FIELDS)
+        return execution_log
+
+    def finish_log(self, execution_log, status, result=None, error_message=None):
+        execution_log.status = status
+        execution_log.result = result
+        execution_log.error_message = error_message
+        execution_log.completed_at = timezone.now()
+        if self.log_mode == LOG_MODE_BATCHED:
+            execution_log_buffer.add(execution_log)
+        elif execution_log.pk is None:
+            execution_log.save(force_insert=True)
+        else:
+            execution_log.save(update_fields=LOG_COMPLETION_FIELDS)
+
+    def drop_run(self, schedule, status, error_message, fire_time=None):
+        from executions.models import ExecutionLog
+
+        existing_pk = self.existing_log_pk()
+        if existing_pk is not None and not self.request.retries:
+            # A redelivered message: its first delivery already logged the run
+            return {status: True}
+        # A retry dropped after its first attempt closes that attempt's row
+        execution_log = ExecutionLog(
+            pk=existing_pk,
+            schedule=schedule,
+            celery_task_id=self.request.id,
+            attempt=self.request.retries + 1,
+            started_at=timezone.now()
+        )
+        self.finish_log(execution_log, status, error_message=error_message)
+        if self.request.retries and fire_time is not None:
+            abandon_run(schedule, fire_time, self.request.id)
+        schedule.advance_next_run_at()
+        return {status: True}
+
+    def claim_owner(self, claimed_by):
+        # A retry owns its run under its own id; re-publishes pass the owner on
+        return self.request.id if self.request.retries else claimed_by
+
+    def handle_overflow(self, schedule, parameters, scheduled_at, fire_time, claimed_by):
+        policy = schedule.task_definition.overflow_policy
+        outcome = concurrency_limiter.try_enqueue(schedule, policy) if policy != OVERFLOW_SKIP else None
+        if outcome == ENQUEUED:
+            self.apply_async(
+                kwargs={
+                    'schedule_id': schedule.id,
+                    'parameters': parameters,
+                    'deferred': True,
+                    'scheduled_at': scheduled_at,
+                    'claimed_by': self.claim_owner(claimed_by),
+                },
+                countdown=settings.CONCURRENCY_DEFER_COUNTDOWN,
+                **schedule.task_definition.routing_options()
+            )
+            return {'deferred': True}
+        if outcome == COALESCED:
+            return self.drop_run(schedule, 'coalesced', 'Folded into the already pending run', fire_time)
+        return self.drop_run(schedule, 'skipped', 'Concurrency limit reached', fire_time)
+
+    def requested_delay(self, schedule, parameters):
+        if not self.delay_parameter:
+            return 0
+        delay = parameters.get(self.delay_parameter) or 0
+        if isinstance(delay, bool) or not isinstance(delay, (int, float)) or delay <= 0:
+            return 0
+        # Schedules saved before the schema had a bound are clamped here
+        spec = field_spec(schedule.task_definition.input_schema.get(self.delay_parameter, {}))
+        if spec.get('max') is not None:
+            delay = min(delay, spec['max'])
+        return delay
+
+    def delay_run(self, schedule, parameters, scheduled_at, delay, claimed_by):
+        # A worker prefetches the countdown message and keeps it unacknowledged
+        # until it is due; no task slot is busy meanwhile. Redis redelivers
+        # unacknowledged messages after visibility_timeout, which settings keep
+        # above the largest delay; claim_run drops a redelivered scheduled fire.
+        self.apply_async(
+            kwargs={
+                'schedule_id': schedule.id,
+                'parameters': parameters,
+                'delayed': True,
+                'scheduled_at': scheduled_at,
+                'claimed_by': self.claim_owner(claimed_by),
+            },
+            countdown=delay,
+            **schedule.task_definition.routing_options()
+        )
+        return {'delayed': delay}
+
+    def misfire_status(self, schedule, fire_time):
+        if fire_time is None:
+            return None
+        return misfire_status(
+            schedule.cron_expression, schedule.misfire_policy, schedule.misfire_grace_seconds,
+            fire_time, timezone.now()
+        )
+
+    def run_execution(
+        self, body, schedule_id, parameters, deferred=False, scheduled_at=None, delayed=False, claimed_by=None
+    ):
+        from schedules.models import Schedule
+
+        try:
+            schedule = Schedule.objects.select_related('user', 'task_definition').get(id=schedule_id)
+        except Schedule.DoesNotExist:
+            return {'error': 'Schedule not found'}
+
+        fire_time = parse_datetime(scheduled_at) if scheduled_at else None
+
+        # Retries, deferred and delayed runs are late on purpose
+        if not deferred and not delayed and not self.request.retries:
+            status = self.misfire_status(schedule, fire_time)
+            if status is not None:
+                return self.drop_run(schedule, status, f'Fire scheduled at {scheduled_at} was overdue')
+
+            delay = self.requested_delay(schedule, parameters)
+            if delay:
+                return self.delay_run(schedule, parameters, scheduled_at, delay, claimed_by)
+
+        if deferred and not self.request.retries:
+            concurrency_limiter.leave_queue(schedule)
+        if not concurrency_limiter.try_start(schedule):
+            return self.handle_overflow(schedule, parameters, scheduled_at, fire_time, claimed_by)
+
+        try:
+            run = None
+            if fire_time is not None:
+                run, verdict = claim_run(
+                    schedule, fire_time, self.request.id, self.request.retries, claimed_by=claimed_by
+                )
+                if verdict != CLAIMED:
+                    # Redelivered or duplicated message: another attempt owns this run
+                    return {verdict: True, 'run_id': run.id, 'status': run.status}
+
+            execution_log = self.start_log(schedule, run)
+
+            try:
+                result = body(schedule, parameters)
+            except Exception as exc:
+                status = 'retry' if self.request.retries < self.max_retries else 'failure'
+                self.finish_log(execution_log, status, error_message=str(exc))
+                if run is not None:
+                    finish_run(run, status)
+                schedule.advance_next_run_at()
+                raise self.retry(exc=exc, countdown=self.get_retry_countdown())
+
+            self.finish_log(execution_log, 'success', result=result)
+            if run is not None:
+                finish_run(run, 'success')
+            schedule.advance_next_run_at()
+            return result
+        finally:
+            concurrency_limiter.finish(schedule)
+
+
+def scheduled_task(countdown=60, max_retries=3, backoff=1, delay_parameter=None, **options):
+    """Register ``body(schedule, parameters)`` as a Celery task run by ScheduledTask.
+
+    ``delay_parameter`` names a parameter giving the seconds the run is
+    re-published with as a countdown before the body starts.
+    """
+
+    def decorator(body):
+        @functools.wraps(body)
+        def run(self, schedule_id, parameters, deferred=False, scheduled_at=None, delayed=False, claimed_by=None):
+            return self.run_execution(body, schedule_id, parameters, deferred, scheduled_at, delayed, claimed_by)
+
+        return shared_task(
+            bind=True,
+            base=ScheduledTask,
+            retry_countdown=countdown,
+            retry_backoff=backoff,
+            max_retries=max_retries,
+            delay_parameter=delay_parameter,
+            **options
+        )(run)
+
+    return decorator
+
+
+@before_task_publish.connect
+def stamp_scheduled_at(body=None, **kwargs):
+    # Beat publishes a schedule at its fire time but does not pass that time
+    # along; the native dispatchers and deferrals already set it
+    task_kwargs = body[1] if isinstance(body, tuple) and len(body) > 1 else None
+    if isinstance(task_kwargs, dict) and 'schedule_id' in task_kwargs:
+        task_kwargs.setdefault('scheduled_at', timezone.now().isoformat())
@@ -1,6 +1,16 @@
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from .models import TaskDefinition
+from .registry import task_registry
+
+
+class TaskDefinitionRegistryField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            task_definition = task_registry.get(data)
+            if task_definition is not None:
+                return task_definition
+        return super().to_internal_value(data)
 
 
 class TaskDefinitionSerializer(serializers.ModelSerializer):
@@ -8,7 +18,11 @@ class TaskDefinitionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TaskDefinition
-        fields = ['id', 'name', 'description', 'input_schema', 'input_fields', 'is_active', 'created_at']
+        fields = [
+            'id', 'name', 'description', 'input_schema', 'input_fields', 'is_active',
+            'max_concurrency', 'max_queue_depth', 'overflow_policy', 'queue', 'routing_key', 'priority',
+            'created_at'
+        ]
         read_only_fields = ['id', 'created_at']
     
     @extend_schema_field(serializers.ListField(child=serializers.CharField()))
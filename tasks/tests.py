@@ -0,0 +1,70 @@
+import array
+import os
+import random
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from .accumulators import QuantileSketch, RunningStats
+from .datasets import ChunkReader, DatasetSummary
+
+
+class AccumulatorParityTests(SimpleTestCase):
+    """The NumPy and pure-Python paths must produce the same summaries."""
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.values = [generator.gauss(0.0, 40.0) for _ in range(20000)] + [0.0] * 25
+
+    def assertStatsEqual(self, first, second):
+        self.assertEqual(first.count, second.count)
+        self.assertAlmostEqual(first.mean, second.mean, places=9)
+        self.assertAlmostEqual(first.variance, second.variance, places=6)
+        self.assertEqual(first.minimum, second.minimum)
+        self.assertEqual(first.maximum, second.maximum)
+
+    def assertSketchEqual(self, first, second):
+        # Bucket insertion order differs between the paths; the buckets must not
+        self.assertEqual(first.positive, second.positive)
+        self.assertEqual(first.negative, second.negative)
+        self.assertEqual((first.zeros, first.count), (second.zeros, second.count))
+
+    def test_running_stats(self):
+        python_stats, numpy_stats = RunningStats(), RunningStats()
+        for offset in range(0, len(self.values), 4096):
+            chunk = self.values[offset:offset + 4096]
+            python_stats.update(chunk)
+            numpy_stats.update(np.asarray(chunk))
+        self.assertStatsEqual(python_stats, numpy_stats)
+
+    def test_quantile_sketch(self):
+        python_sketch, numpy_sketch = QuantileSketch(), QuantileSketch()
+        python_sketch.update(self.values)
+        numpy_sketch.update(np.asarray(self.values))
+        self.assertSketchEqual(python_sketch, numpy_sketch)
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            self.assertEqual(python_sketch.quantile(q), numpy_sketch.quantile(q))
+
+    def test_binary_reader(self):
+        values = array.array('d', self.values + [float('nan'), float('inf')])
+        with tempfile.NamedTemporaryFile(suffix='.f64', delete=False) as handle:
+            values.tofile(handle)
+        self.addCleanup(os.unlink, handle.name)
+
+        def summarize():
+            summary = DatasetSummary(with_quantiles=True)
+            reader = ChunkReader(handle.name, chunk_size=3000)
+            for chunk in reader:
+                summary.update(chunk)
+            return summary, reader.skipped
+
+        numpy_summary, numpy_skipped = summarize()
+        with mock.patch('tasks.datasets.np', None), mock.patch('tasks.accumulators.np', None):
+            python_summary, python_skipped = summarize()
+
+        self.assertEqual(numpy_skipped, 2)
+        self.assertEqual(python_skipped, numpy_skipped)
+        self.assertStatsEqual(python_summary.stats, numpy_summary.stats)
+        self.assertSketchEqual(python_summary.sketch, numpy_summary.sketch)
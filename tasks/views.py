@@ -6,6 +6,10 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from drf_spectacular.utils import extend_schema
 from .models import TaskDefinition
 from .serializers import TaskDefinitionSerializer
+from .registry import task_registry
+from executions.models import ExecutionLog
+from executions.serializers import ExecutionStatsQuerySerializer, TaskDefinitionStatsSerializer
+from executions.stats import execution_stats, filter_window
 
 
 class TaskDefinitionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -18,15 +22,50 @@ class TaskDefinitionViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['name', 'description']
     ordering = ['name']
     
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        task_definition = task_registry.get(self.kwargs[lookup_url_kwarg])
+        if task_definition is None:
+            return super().get_object()
+        self.check_object_permissions(self.request, task_definition)
+        return task_definition
+    
     @extend_schema(
         responses={200: TaskDefinitionSerializer(many=True)}
     )
     @action(detail=False, methods=['get'])
     def available(self, request):
-        queryset = self.get_queryset()
+        queryset = task_registry.active()
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+    
+    @extend_schema(
+        parameters=[ExecutionStatsQuerySerializer],
+        responses={200: TaskDefinitionStatsSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        params = ExecutionStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        executions = ExecutionLog.objects.all()
+        if not request.user.is_superuser:
+            executions = executions.filter(schedule__user=request.user)
+        executions = filter_window(
+            executions,
+            params.validated_data.get('since'),
+            params.validated_data.get('until')
+        )
+        results = execution_stats(
+            executions,
+            group_by=['schedule__task_definition_id', 'schedule__task_definition__name'],
+            bucket=params.validated_data.get('bucket')
+        )
+        for row in results:
+            row['task_definition_id'] = row.pop('schedule__task_definition_id')
+            row['task_definition_name'] = row.pop('schedule__task_definition__name')
+        return Response(TaskDefinitionStatsSerializer(results, many=True).data)
\ No newline at end of file